@@ -1,5 +1,5 @@
 import os
-# import datetime
+import datetime
 
 BASE_DIR = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,15 +24,27 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gestor_absencies.common.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'gestor_absencies.common.middleware.ApiSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gestor_absencies.common.middleware.ApiCsrfViewMiddleware',
+    'gestor_absencies.common.middleware.ApiAuthenticationMiddleware',
+    'gestor_absencies.common.middleware.ApiMessageMiddleware',
+    'gestor_absencies.common.middleware.ApiXFrameOptionsMiddleware',
 ]
 
+# With API mode on, requests under ABSENCIES_API_PREFIX skip the session,
+# CSRF, authentication, message and frame options middleware. They must then
+# authenticate with a token or basic credentials.
+ABSENCIES_API_MODE = False
+
+ABSENCIES_API_PREFIX = '/absencies/'
+
+# Record latency, query count and payload size of every request, served by
+# /absencies/metrics and logged by gestor_absencies.common.metrics
+ABSENCIES_METRICS = True
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -70,6 +82,57 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Cache alias holding the responses of teams, vacation policies and absence
+# types. Point it to a shared backend (memcached, redis...) to share entries
+# and invalidations between processes.
+ABSENCIES_RESPONSE_CACHE = 'default'
+
+# Cache alias holding the versions of the per-process caches of permissions
+# and absence types. With the per-process LocMemCache, a change reaches the
+# other processes only once their entries are older than
+# ABSENCIES_VERSIONED_CACHE_TTL seconds; point it to a shared backend for
+# immediate invalidation. A TTL of 0 disables those caches.
+ABSENCIES_VERSION_CACHE = 'default'
+
+ABSENCIES_VERSIONED_CACHE_TTL = 60
+
+# Hash batches of passwords (bulk worker import) in a thread pool of this
+# size. 0 hashes them in the request thread.
+ABSENCIES_PASSWORD_HASH_WORKERS = 0
+
+# Largest page_size accepted by list endpoints using ?pagination=cursor
+ABSENCIES_CURSOR_MAX_PAGE_SIZE = 1000
+
+# Absence notifications are queued and sent by manage.py drain_notifications.
+# The console backend prints them, use the file backend (with
+# EMAIL_FILE_PATH) to keep them or the smtp one to deliver them.
+# They are sent from DEFAULT_FROM_EMAIL.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Mails sent at once by each drain_notifications batch
+ABSENCIES_NOTIFICATION_THREADS = 4
+
+# Attempts before a notification is marked as failed
+ABSENCIES_NOTIFICATION_MAX_ATTEMPTS = 5
+
+# /absencies/sync looks for changes again this many seconds before the
+# client's since, to return the rows whose transaction committed after the
+# previous sync read them. Longer transactions can still be missed.
+ABSENCIES_SYNC_OVERLAP = 60
+
+# Deletions are kept this many days for the sync clients (pruned by
+# manage.py prune_tombstones). Clients not synced for longer start over.
+ABSENCIES_SYNC_TOMBSTONE_DAYS = 90
+
+# Objects per page of the first sync of a client
+ABSENCIES_SYNC_PAGE_SIZE = 1000
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -77,13 +140,35 @@ REST_FRAMEWORK = {
         'gestor_absencies.common.absencies_perm.GestorAbsenciesPermissions',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_jwt.authentication.JSONWebTokenAuthentication',
+        'gestor_absencies.common.authentication.CachedJSONWebTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'gestor_absencies.common.authentication.CachedBasicAuthentication',
     ),
-    'JWT_VERIFY_EXPIRATION': False
 }
 
+# Short lived access tokens, renewed through api-token-refresh/ until a week
+# after the login.
+JWT_AUTH = {
+    'JWT_VERIFY_EXPIRATION': True,
+    'JWT_EXPIRATION_DELTA': datetime.timedelta(minutes=15),
+    'JWT_ALLOW_REFRESH': True,
+    'JWT_REFRESH_EXPIRATION_DELTA': datetime.timedelta(days=7),
+}
+
+# Verified tokens are kept in each process with a snapshot of their worker
+# for this many seconds, so a deactivated worker or a changed password is
+# rejected at most this late. 0 disables the cache.
+ABSENCIES_JWT_CACHE_TTL = 60
+
+# Most tokens kept by each process, the least recently used ones are dropped
+ABSENCIES_JWT_CACHE_SIZE = 1000
+
+# Same for valid basic auth credentials, which are otherwise checked against
+# the password hash on every request.
+ABSENCIES_BASIC_AUTH_CACHE_TTL = 60
+
+ABSENCIES_BASIC_AUTH_CACHE_SIZE = 1000
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
@@ -108,6 +193,10 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'message': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'console': {
@@ -115,6 +204,14 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose'
         },
+        # JSON line per request, on stdout apart from the console. Point it
+        # to a file or a log shipper to keep it out of the process output.
+        'metrics': {
+            'level': 'INFO',
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'message'
+        },
     },
     'loggers': {
         'django': {
@@ -124,6 +221,11 @@ LOGGING = {
         'gestor_absencies': {
             'handlers': ['console'],
             'level': 'INFO'
-        }
+        },
+        'gestor_absencies.common.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     }
 }
@@ -0,0 +1,27 @@
+from .base import *
+
+
+DEBUG = False
+
+# Argon2 hashes new passwords, the others keep verifying (and upgrading on
+# login) the hashes stored before.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+ABSENCIES_PASSWORD_HASH_WORKERS = 4
+
+ABSENCIES_API_MODE = True
+
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+# API requests carry no session, so only token and basic auth are tried
+REST_FRAMEWORK = dict(
+    REST_FRAMEWORK,
+    DEFAULT_AUTHENTICATION_CLASSES=(
+        'gestor_absencies.common.authentication.CachedJSONWebTokenAuthentication',
+        'gestor_absencies.common.authentication.CachedBasicAuthentication',
+    )
+)
@@ -0,0 +1,6 @@
+from .develop import *
+
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
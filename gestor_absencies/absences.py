@@ -0,0 +1,117 @@
+from dateutil import rrule
+from django.db import transaction
+from swingtime.models import Occurrence
+
+from gestor_absencies.common.bulk import bulk_create_inherited
+
+from .balances import absence_days_by_year, add_spent_days, days_by_year
+from .models import SomEnergiaAbsence, SomEnergiaOccurrence
+from .notifications import enqueue_notifications
+
+FREQUENCIES = {
+    'daily': rrule.DAILY,
+    'weekly': rrule.WEEKLY,
+    'monthly': rrule.MONTHLY,
+}
+
+RECURRENCE_FIELDS = ('freq', 'interval', 'count', 'until')
+
+MAX_OCCURRENCES = 366
+
+
+def occurrence_times(start_time, end_time, freq=None, interval=1,
+                     count=None, until=None):
+    """Return the (start, end) pairs of every occurrence of an absence.
+
+    Without ``count`` nor ``until`` the absence has a single occurrence, as in
+    swingtime's ``Event.add_occurrences``.
+    """
+    if not (count or until):
+        return [(start_time, end_time)]
+
+    duration = end_time - start_time
+    starts = rrule.rrule(
+        FREQUENCIES[freq or 'daily'],
+        dtstart=start_time,
+        interval=interval,
+        count=count,
+        until=until
+    )
+    return [(start, start + duration) for start in starts]
+
+
+def create_occurrences(absence, times):
+    """Insert the occurrences of an absence with a constant number of queries.
+
+    Django can not bulk_create multi-table inherited models, so the swingtime
+    rows are bulk created first and the SomEnergiaOccurrence rows pointing to
+    them are inserted afterwards in a single statement.
+    """
+    return bulk_create_inherited(SomEnergiaOccurrence, [
+        SomEnergiaOccurrence(
+            event_id=absence.pk,
+            absence_id=absence.pk,
+            start_time=start,
+            end_time=end,
+        )
+        for start, end in times
+    ])
+
+
+def delete_occurrences(absence):
+    Occurrence.objects.filter(event_id=absence.pk).delete()
+
+
+def update_balance(absence, times, sign=1):
+    if absence.worker_id and absence.absence_type.spend_days:
+        add_spent_days(absence.worker_id, days_by_year(times), sign)
+
+
+@transaction.atomic
+def create_absence(worker, absence_type, start_time, end_time,
+                   title='', description='', **recurrence):
+    absence = SomEnergiaAbsence.objects.create(
+        title=title or absence_type.label[:32],
+        description=description,
+        event_type_id=absence_type.pk,
+        absence_type=absence_type,
+        worker=worker,
+    )
+    times = occurrence_times(start_time, end_time, **recurrence)
+    create_occurrences(absence, times)
+    update_balance(absence, times)
+    enqueue_notifications(absence, 'created', times)
+    return absence
+
+
+@transaction.atomic
+def update_absence(absence, worker, absence_type, start_time, end_time,
+                   title='', description='', **recurrence):
+    if absence.worker_id:
+        add_spent_days(absence.worker_id, absence_days_by_year(absence), -1)
+
+    absence.title = title or absence_type.label[:32]
+    absence.description = description
+    absence.event_type_id = absence_type.pk
+    absence.absence_type = absence_type
+    absence.worker = worker
+    # a changed absence has to be approved again
+    absence.status = SomEnergiaAbsence.PENDING
+    absence.save()
+
+    delete_occurrences(absence)
+    times = occurrence_times(start_time, end_time, **recurrence)
+    create_occurrences(absence, times)
+    update_balance(absence, times)
+    enqueue_notifications(absence, 'updated', times)
+    return absence
+
+
+@transaction.atomic
+def delete_absence(absence):
+    if absence.worker_id:
+        add_spent_days(absence.worker_id, absence_days_by_year(absence), -1)
+    enqueue_notifications(absence, 'deleted', absence.occurrence_set.order_by(
+        'start_time'
+    ).values_list('start_time', 'end_time'))
+    absence.delete()
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .availability import absent_days, approved_occurrences
+from .balances import add_spent_days, days_by_year
+from .models import Member, SomEnergiaAbsence, SomEnergiaOccurrence, Team
+from .rules import validate_durations
+
+MAX_APPROVALS = 1000
+
+
+def worker_teams(worker_ids):
+    """Map every worker to the set of its teams, with a single query."""
+    teams = defaultdict(set)
+    for worker_id, team_id in Member.objects.filter(
+        worker__in=worker_ids
+    ).values_list('worker', 'team'):
+        teams[worker_id].add(team_id)
+    return teams
+
+
+def unauthorized_absences(user, absences):
+    """Return the absences the user may not approve nor reject.
+
+    Superusers may decide on any absence and referents on the absences of
+    the members of their teams but their own. Permissions are checked once
+    per team, whatever the number of absences.
+    """
+    if user.is_superuser:
+        return []
+    referent_teams = set(Member.objects.filter(
+        worker=user, is_referent=True
+    ).values_list('team', flat=True))
+    teams = worker_teams({absence.worker_id for absence in absences})
+    return [
+        absence for absence in absences
+        if absence.worker_id == user.pk or
+        not teams[absence.worker_id] & referent_teams
+    ]
+
+
+def spent_days_by_worker(absences):
+    """Days held in the ledger by some absences, per worker and year."""
+    spending = [
+        absence.pk for absence in absences
+        if absence.worker_id and absence.absence_type.spend_days
+    ]
+    times = defaultdict(list)
+    for worker_id, start_time, end_time in SomEnergiaOccurrence.objects.filter(
+        absence__in=spending
+    ).values_list('absence__worker', 'start_time', 'end_time'):
+        times[worker_id].append((start_time, end_time))
+    return {
+        worker_id: days_by_year(worker_times)
+        for worker_id, worker_times in times.items()
+    }
+
+
+def duration_errors(absences):
+    """Errors of the absences breaking the duration bounds of their type.
+
+    The occurrences of the whole batch are read at once and checked against
+    the cached absence types. Returns {absence id: errors}.
+    """
+    occurrences = SomEnergiaOccurrence.objects.filter(absence__in=absences)
+    times = defaultdict(list)
+    for absence_id, start_time, end_time in occurrences.values_list(
+        'absence', 'start_time', 'end_time'
+    ):
+        times[absence_id].append((start_time, end_time))
+    errors = validate_durations([
+        (absence.absence_type_id, times[absence.pk]) for absence in absences
+    ])
+    return {
+        absence.pk: absence_errors
+        for absence, absence_errors in zip(absences, errors)
+        if absence_errors
+    }
+
+
+def set_status(absences, status):
+    """Approve or reject absences, keeping the holiday ledger in sync.
+
+    Rejected absences give their days back and absences leaving the rejected
+    status spend them again.
+    """
+    rejecting = status == SomEnergiaAbsence.REJECTED
+    changing = [
+        absence for absence in absences
+        if rejecting != (absence.status == SomEnergiaAbsence.REJECTED)
+    ]
+    for worker_id, days in spent_days_by_worker(changing).items():
+        add_spent_days(worker_id, days, -1 if rejecting else 1)
+
+    SomEnergiaAbsence.objects.filter(
+        pk__in=[absence.pk for absence in absences]
+    ).update(status=status, modified_date=timezone.now())
+    for absence in absences:
+        absence.status = status
+
+
+def coverage_violations(absences):
+    """Days newly approved absences take a team below its ``min_worker``.
+
+    Every affected team is checked once over the days spanned by the
+    absences, counting its present members with and without them. A day
+    covered by the absences is reported when it ends up below the minimum
+    and the absences lowered its presence, even if it was below already.
+    """
+    approving = {absence.pk for absence in absences}
+    days = defaultdict(set)
+    for worker_id, start_time, end_time in SomEnergiaOccurrence.objects.filter(
+        absence__in=approving
+    ).values_list('absence__worker', 'start_time', 'end_time'):
+        day = timezone.localdate(start_time)
+        last = timezone.localdate(end_time - timedelta(microseconds=1))
+        while day <= last:
+            days[worker_id].add(day)
+            day += timedelta(days=1)
+
+    teams = worker_teams(list(days))
+    team_days = defaultdict(set)
+    for worker_id, worker_days in days.items():
+        for team_id in teams[worker_id]:
+            team_days[team_id] |= worker_days
+
+    violations = []
+    for team in Team.objects.filter(
+        pk__in=team_days, min_worker__gt=0
+    ).order_by('pk'):
+        affected = team_days[team.pk]
+        start = min(affected)
+        span = (max(affected) - start).days + 1
+        members = Member.objects.filter(team=team).count()
+        occurrences = list(approved_occurrences(team, start, span).values_list(
+            'absence', 'absence__worker', 'start_time', 'end_time'
+        ))
+        absent = absent_days(
+            [occurrence[1:] for occurrence in occurrences], start, span
+        )
+        absent_before = absent_days(
+            [occurrence[1:] for occurrence in occurrences
+             if occurrence[0] not in approving],
+            start, span
+        )
+        for day in range(span):
+            date = start + timedelta(days=day)
+            present = members - absent[day]
+            if date in affected and present < team.min_worker and \
+               absent[day] > absent_before[day]:
+                violations.append({
+                    'team': team.pk,
+                    'date': date,
+                    'present': present,
+                    'min_worker': team.min_worker,
+                })
+    return violations
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class GestorAbsenciesConfig(AppConfig):
     name = 'gestor_absencies'
+
+    def ready(self):
+        from gestor_absencies import signals  # noqa: F401
@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Member, SomEnergiaAbsence, SomEnergiaOccurrence
+
+MAX_AVAILABILITY_DAYS = 3 * 366
+
+
+def absent_days(occurrences, start, days):
+    """Count the absent workers of every day with a single sweep.
+
+    ``occurrences`` are (worker id, start time, end time) tuples ordered by
+    worker and start time. The occurrences of each worker are merged into
+    runs of days first, so a worker with overlapping absences is counted once
+    per day, and every run adds one to a difference array.
+    """
+    delta = [0] * (days + 1)
+
+    def add_run(first, last):
+        first = max(first, 0)
+        last = min(last, days - 1)
+        if first <= last:
+            delta[first] += 1
+            delta[last + 1] -= 1
+
+    current_worker = run = None
+    for worker_id, start_time, end_time in occurrences:
+        first = (timezone.localdate(start_time) - start).days
+        last = (
+            timezone.localdate(end_time - timedelta(microseconds=1)) - start
+        ).days
+        if worker_id == current_worker and first <= run[1] + 1:
+            run[1] = max(run[1], last)
+            continue
+        if run:
+            add_run(*run)
+        current_worker, run = worker_id, [first, last]
+    if run:
+        add_run(*run)
+
+    absent = []
+    count = 0
+    for day in range(days):
+        count += delta[day]
+        absent.append(count)
+    return absent
+
+
+def approved_occurrences(team, start, days):
+    """Approved occurrences of the members of a team overlapping some days,
+    ordered by worker and start time as ``absent_days`` expects them."""
+    range_start = timezone.make_aware(datetime.combine(start, time.min))
+    range_end = range_start + timedelta(days=days)
+    return SomEnergiaOccurrence.objects.filter(
+        absence__worker__member__team=team,
+        absence__status=SomEnergiaAbsence.APPROVED,
+        start_time__lt=range_end,
+        end_time__gt=range_start,
+    ).order_by('absence__worker', 'start_time')
+
+
+def team_availability(team, start, end):
+    """Return how many members of a team are present each day of a range.
+
+    ``start`` and ``end`` are dates, both included. Days with fewer present
+    members than ``Team.min_worker`` are flagged.
+    """
+    days = (end - start).days + 1
+    members = Member.objects.filter(team=team).count()
+    occurrences = approved_occurrences(team, start, days).values_list(
+        'absence__worker', 'start_time', 'end_time'
+    )
+
+    return [
+        {
+            'date': start + timedelta(days=day),
+            'present': members - absent,
+            'absent': absent,
+            'below_min_worker': members - absent < team.min_worker,
+        }
+        for day, absent in enumerate(absent_days(occurrences, start, days))
+    ]
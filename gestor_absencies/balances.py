@@ -0,0 +1,147 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import HolidayBalance, SomEnergiaAbsence, SomEnergiaOccurrence
+
+HALF_DAY = timedelta(hours=4)
+
+FULL_DAY = timedelta(days=1)
+
+
+def occurrence_days(start_time, end_time):
+    """Return the days of holidays spent by one occurrence."""
+    return duration_days(end_time - start_time)
+
+
+def duration_days(duration):
+    """Return the days of holidays spent by an occurrence lasting so long.
+
+    Occurrences up to four hours are half a day, longer ones within a day a
+    full day, and occurrences of a day or more count their length in days.
+    """
+    if duration <= HALF_DAY:
+        return Decimal('0.5')
+    if duration < FULL_DAY:
+        return Decimal(1)
+    return Decimal(duration.total_seconds() / 86400).quantize(Decimal('0.1'))
+
+
+def local_year_start(year):
+    return timezone.make_aware(datetime(year, 1, 1))
+
+
+def occurrence_days_by_year(start_time, end_time):
+    """Split the days spent by one occurrence among the years it spans.
+
+    Every part of an occurrence crossing a new year counts as an occurrence
+    of its own, so the last days of December are spent in their year.
+    """
+    days = {}
+    year = timezone.localdate(start_time).year
+    while True:
+        next_year = local_year_start(year + 1)
+        if end_time <= next_year:
+            days[year] = occurrence_days(start_time, end_time)
+            return days
+        days[year] = occurrence_days(start_time, next_year)
+        start_time = next_year
+        year += 1
+
+
+def days_by_year(times):
+    """Sum the days of (start, end) pairs by the year they are spent in."""
+    days = defaultdict(Decimal)
+    for start_time, end_time in times:
+        for year, spent in occurrence_days_by_year(
+            start_time, end_time
+        ).items():
+            days[year] += spent
+    return days
+
+
+def absence_days_by_year(absence):
+    """Days an absence holds in the ledger, none once it is rejected."""
+    if not absence.absence_type.spend_days or \
+       absence.status == SomEnergiaAbsence.REJECTED:
+        return {}
+    return days_by_year(
+        absence.occurrence_set.values_list('start_time', 'end_time')
+    )
+
+
+def add_spent_days(worker_id, days, sign=1):
+    """Add (or with ``sign=-1`` subtract) days per year to a worker ledger."""
+    for year, spent in days.items():
+        balance, _ = HolidayBalance.objects.get_or_create(
+            worker_id=worker_id, year=year
+        )
+        HolidayBalance.objects.filter(pk=balance.pk).update(
+            spent_days=F('spent_days') + sign * spent,
+            modified_date=timezone.now()
+        )
+
+
+def rebuild_holiday_balances(worker_ids=None, batch_size=1000):
+    """Recompute the ledger from the occurrences, of some workers or all.
+
+    Years a worker no longer spends days in are kept with no days, so the
+    balances still change instead of disappearing. Return the number of
+    balances written.
+    """
+    occurrences = SomEnergiaOccurrence.objects.filter(
+        absence__worker__isnull=False,
+        absence__absence_type__spend_days=True,
+    ).exclude(
+        absence__status=SomEnergiaAbsence.REJECTED
+    )
+    balances = HolidayBalance.objects.all()
+    spent = defaultdict(Decimal)
+    if worker_ids is not None:
+        occurrences = occurrences.filter(absence__worker__in=worker_ids)
+        balances = balances.filter(worker__in=worker_ids)
+        for key in balances.values_list('worker', 'year'):
+            spent[key] = Decimal(0)
+
+    for worker_id, start_time, end_time in occurrences.values_list(
+        'absence__worker', 'start_time', 'end_time'
+    ).iterator(chunk_size=batch_size):
+        for year, days in occurrence_days_by_year(
+            start_time, end_time
+        ).items():
+            spent[worker_id, year] += days
+
+    with transaction.atomic():
+        balances.delete()
+        HolidayBalance.objects.bulk_create(
+            [
+                HolidayBalance(worker_id=worker_id, year=year, spent_days=days)
+                for (worker_id, year), days in spent.items()
+            ],
+            batch_size=batch_size
+        )
+    return len(spent)
+
+
+def get_allowance(worker):
+    """Yearly holidays of a worker: its policy ones plus its own extra days."""
+    policy = worker.vacation_policy
+    return (policy.holidays if policy else 0) + worker.holidays
+
+
+def get_holiday_balance(worker, year):
+    balance = HolidayBalance.objects.filter(
+        worker=worker, year=year
+    ).values_list('spent_days', flat=True).first()
+    spent = balance or Decimal(0)
+    allowance = get_allowance(worker)
+    return {
+        'year': year,
+        'allowance': allowance,
+        'spent_days': spent,
+        'remaining_days': allowance - spent,
+    }
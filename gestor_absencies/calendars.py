@@ -0,0 +1,147 @@
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from gestor_absencies.common.conditional import last_deletion, latest
+
+from .models import Member, SomEnergiaAbsence, SomEnergiaOccurrence
+
+CALENDAR_CONTENT_TYPE = 'text/calendar; charset=utf-8'
+
+PRODID = '-//Som Energia//Gestor Absencies//CA'
+
+ITERATOR_CHUNK_SIZE = 2000
+
+OCCURRENCE_FIELDS = (
+    'pk',
+    'start_time',
+    'end_time',
+    'absence__title',
+    'absence__description',
+    'absence__modified_date',
+    'absence__absence_type__abbr',
+    'absence__absence_type__label',
+    'absence__worker__first_name',
+    'absence__worker__last_name',
+    'absence__worker__username',
+)
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line in lines of at most 75 octets (RFC 5545 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    lines = []
+    current = ''
+    for char in line:
+        if len((current + char).encode('utf-8')) > 75:
+            lines.append(current)
+            current = ' '
+        current += char
+    lines.append(current)
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def format_datetime(value):
+    return timezone.localtime(value, timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def worker_calendar_occurrences(worker):
+    return SomEnergiaOccurrence.objects.filter(
+        absence__worker=worker
+    ).exclude(absence__status=SomEnergiaAbsence.REJECTED)
+
+
+def team_calendar_occurrences(team):
+    return SomEnergiaOccurrence.objects.filter(
+        absence__worker__member__team=team
+    ).exclude(absence__status=SomEnergiaAbsence.REJECTED)
+
+
+def calendar_version(absences, members=None):
+    """Count and latest changes of everything shown by a feed.
+
+    Deleted absences and members leave no newer ``modified_date`` behind,
+    so the latest deletion of each of them, anywhere, counts as a change.
+    """
+    version = absences.aggregate(
+        count=Count('pk'),
+        absences_modified=Max('modified_date'),
+        types_modified=Max('absence_type__modified_date'),
+        workers_modified=Max('worker__modified_date'),
+    )
+    version['absences_deleted'] = last_deletion(SomEnergiaAbsence)
+    if members is not None:
+        version.update(members.aggregate(
+            members=Count('pk'),
+            members_modified=Max('modified_date'),
+        ))
+        version['members_deleted'] = last_deletion(Member)
+    version['last_modified'] = latest(*(
+        value for key, value in version.items()
+        if key.endswith(('_modified', '_deleted'))
+    ))
+    return version
+
+
+def worker_calendar_version(worker):
+    return calendar_version(SomEnergiaAbsence.objects.filter(worker=worker))
+
+
+def team_calendar_version(team):
+    return calendar_version(
+        SomEnergiaAbsence.objects.filter(worker__member__team=team),
+        Member.objects.filter(team=team)
+    )
+
+
+def render_event(occurrence, host):
+    (pk, start_time, end_time, title, description, modified_date,
+     abbr, label, first_name, last_name, username) = occurrence
+    name = ' '.join(filter(None, (first_name, last_name))) or username
+    lines = [
+        'BEGIN:VEVENT',
+        'UID:occurrence-{}@{}'.format(pk, host),
+        'DTSTAMP:' + format_datetime(modified_date),
+        'DTSTART:' + format_datetime(start_time),
+        'DTEND:' + format_datetime(end_time),
+        'SUMMARY:' + escape('{}: {}'.format(name, title or label)),
+        'CATEGORIES:' + escape(abbr),
+    ]
+    if description:
+        lines.append('DESCRIPTION:' + escape(description))
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def render_calendar(name, occurrences, host):
+    """Yield an iCalendar document event by event.
+
+    Occurrences are read with a server-side cursor, so only a chunk of them
+    is held in memory whatever the size of the feed.
+    """
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:' + PRODID,
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:' + escape(name),
+    ))
+    rows = occurrences.order_by('start_time', 'pk').values_list(
+        *OCCURRENCE_FIELDS
+    ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    for occurrence in rows:
+        yield render_event(occurrence, host)
+    yield 'END:VCALENDAR\r\n'
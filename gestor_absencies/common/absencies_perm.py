@@ -1,4 +1,34 @@
-from rest_framework.permissions import DjangoModelPermissions
+from django.contrib.auth.models import Permission
+from django.db.models import Q
+from rest_framework.permissions import BasePermission, DjangoModelPermissions
+
+from gestor_absencies.common.versioned_cache import VersionedCache
+
+
+permission_cache = VersionedCache('permissions')
+
+
+def _load_permissions(user):
+    permissions = Permission.objects.filter(
+        Q(user=user) | Q(group__user=user)
+    ).values_list('content_type__app_label', 'codename').distinct()
+    return frozenset(
+        '{}.{}'.format(app_label, codename)
+        for app_label, codename in permissions
+    )
+
+
+def get_cached_permissions(user):
+    """Return the set of 'app_label.codename' permissions of a user."""
+    return permission_cache.get(user.pk, lambda: _load_permissions(user))
+
+
+def has_cached_perms(user, perms):
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return set(perms) <= get_cached_permissions(user)
 
 
 class GestorAbsenciesPermissions(DjangoModelPermissions):
@@ -12,3 +42,23 @@ class GestorAbsenciesPermissions(DjangoModelPermissions):
         'PATCH': ['%(app_label)s.change_%(model_name)s'],
         'DELETE': ['%(app_label)s.delete_%(model_name)s'],
     }
+
+    def has_permission(self, request, view):
+        if getattr(view, '_ignore_model_permissions', False):
+            return True
+
+        if not request.user or (
+           not request.user.is_authenticated and self.authenticated_users_only):
+            return False
+
+        queryset = self._queryset(view)
+        perms = self.get_required_permissions(request.method, queryset.model)
+
+        return has_cached_perms(request.user, perms)
+
+
+class IsSuperUser(BasePermission):
+    """Allow only superusers, the administrators of this application."""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_superuser)
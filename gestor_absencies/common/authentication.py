@@ -0,0 +1,156 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import BasicAuthentication
+from rest_framework_jwt.authentication import JSONWebTokenAuthentication
+
+
+class TokenCache(object):
+    """Bounded in-process mapping of credentials to expiring values.
+
+    Entries expire after their own deadline and the least recently used
+    ones are dropped once ``max_entries`` is reached.
+    """
+
+    def __init__(self, ttl_setting, size_setting, default_ttl=60,
+                 default_size=1000):
+        self.ttl_setting = ttl_setting
+        self.size_setting = size_setting
+        self.default_ttl = default_ttl
+        self.default_size = default_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting, self.default_ttl)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, self.size_setting, self.default_size)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires=None):
+        ttl = self.ttl
+        if ttl <= 0:
+            return
+        expires = min(expires or float('inf'), time.time() + ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache('ABSENCIES_JWT_CACHE_TTL', 'ABSENCIES_JWT_CACHE_SIZE')
+
+basic_auth_cache = TokenCache(
+    'ABSENCIES_BASIC_AUTH_CACHE_TTL', 'ABSENCIES_BASIC_AUTH_CACHE_SIZE'
+)
+
+# Basic credentials are only kept as a keyed digest, with a key that never
+# leaves the process.
+_credentials_secret = os.urandom(32)
+
+
+def clear_credential_caches():
+    token_cache.clear()
+    basic_auth_cache.clear()
+
+
+def credentials_key(userid, password):
+    return hmac.new(
+        _credentials_secret,
+        '{}:{}'.format(userid, password).encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+
+
+def snapshot_user(user):
+    fields = tuple(field.attname for field in user._meta.concrete_fields)
+    return fields, tuple(getattr(user, field) for field in fields)
+
+
+def restore_user(snapshot):
+    """Build a fresh user instance, as if loaded from the database."""
+    fields, values = snapshot
+    return get_user_model().from_db(DEFAULT_DB_ALIAS, fields, values)
+
+
+class CachedJSONWebTokenAuthentication(JSONWebTokenAuthentication):
+    """JSON Web Token authentication skipping verified tokens.
+
+    The first request of a token decodes it and loads its worker as usual.
+    The token is then kept in ``token_cache`` with a snapshot of the worker
+    until the token expires or ABSENCIES_JWT_CACHE_TTL seconds pass, and
+    the following requests rebuild the worker from the snapshot without
+    any query. Permissions are resolved by the permission cache, which
+    follows group and permission changes.
+    """
+
+    def authenticate(self, request):
+        jwt_value = self.get_jwt_value(request)
+        if jwt_value is None:
+            return None
+
+        snapshot = token_cache.get(jwt_value)
+        if snapshot is not None:
+            return (restore_user(snapshot), jwt_value)
+
+        self.expires = None
+        user, jwt_value = super(
+            CachedJSONWebTokenAuthentication, self
+        ).authenticate(request)
+        token_cache.set(jwt_value, snapshot_user(user), self.expires)
+        return (user, jwt_value)
+
+    def authenticate_credentials(self, payload):
+        self.expires = payload.get('exp')
+        return super(
+            CachedJSONWebTokenAuthentication, self
+        ).authenticate_credentials(payload)
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """Basic authentication hashing each password once per TTL.
+
+    Checking a password runs the (deliberately slow) password hasher, which
+    would otherwise happen on every request. Valid credentials are kept in
+    ``basic_auth_cache`` with a snapshot of their worker for
+    ABSENCIES_BASIC_AUTH_CACHE_TTL seconds. Wrong ones are never cached.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = credentials_key(userid, password)
+        snapshot = basic_auth_cache.get(key)
+        if snapshot is not None:
+            return (restore_user(snapshot), None)
+
+        user, auth = super(
+            CachedBasicAuthentication, self
+        ).authenticate_credentials(userid, password, request)
+        basic_auth_cache.set(key, snapshot_user(user))
+        return (user, auth)
@@ -0,0 +1,63 @@
+from django.db import connection, transaction
+
+
+def bulk_create_with_pks(model, objects):
+    """bulk_create setting the primary keys on every database.
+
+    Backends that can not return the inserted ids (SQLite) read them back
+    as the largest ids of the table, in the same transaction as the insert:
+    SQLite keeps other writers out until it commits, so they are the rows
+    just inserted.
+    """
+    with transaction.atomic(savepoint=False):
+        model._base_manager.bulk_create(objects)
+        if objects and objects[0].pk is None:
+            pks = list(model._base_manager.order_by(
+                '-pk'
+            ).values_list('pk', flat=True)[:len(objects)])
+            for obj, pk in zip(objects, reversed(pks)):
+                obj.pk = pk
+    return objects
+
+
+def bulk_create_inherited(model, objects):
+    """bulk_create for models inheriting from a single concrete model.
+
+    Django refuses to bulk create them, so the parent rows are bulk created
+    first and the child rows, pointing to them, inserted afterwards in
+    batches.
+
+    The child rows go through ``Manager._insert``, the private method behind
+    ``Model.save`` and ``bulk_create``. Its ``(objs, fields)`` arguments
+    are the ones of Django 2.2, which requirements.txt pins below 3.0; check
+    them again when upgrading Django.
+    """
+    (parent, pointer), = model._meta.parents.items()
+    parent_fields = [
+        field for field in parent._meta.concrete_fields
+        if not field.primary_key
+    ]
+    with transaction.atomic(savepoint=False):
+        parents = bulk_create_with_pks(parent, [
+            parent(**{
+                field.attname: getattr(obj, field.attname)
+                for field in parent_fields
+            })
+            for obj in objects
+        ])
+
+        for obj, parent_obj in zip(objects, parents):
+            setattr(obj, pointer.attname, parent_obj.pk)
+            for field in parent_fields:
+                setattr(
+                    obj, field.attname, getattr(parent_obj, field.attname)
+                )
+            obj._state.adding = False
+
+        fields = model._meta.local_concrete_fields
+        batch_size = max(1, connection.ops.bulk_batch_size(fields, objects))
+        for start in range(0, len(objects), batch_size):
+            model._base_manager._insert(
+                objects[start:start + batch_size], fields=fields
+            )
+    return objects
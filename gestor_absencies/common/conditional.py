@@ -0,0 +1,98 @@
+import calendar
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode('utf-8')
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def conditional_response(request, etag, last_modified=None):
+    """Return a 304 response if the client copy is fresh, None otherwise."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            calendar.timegm(last_modified.utctimetuple())
+            if last_modified else None
+        )
+    )
+
+
+def set_conditional_headers(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(
+            calendar.timegm(last_modified.utctimetuple())
+        )
+    return response
+
+
+def last_deletion(model):
+    """Date of the latest deletion of a model kept as a sync tombstone."""
+    from gestor_absencies.models import Tombstone
+    return Tombstone.objects.filter(
+        model=model._meta.label_lower
+    ).aggregate(last=Max('deleted_date'))['last']
+
+
+def latest(*dates):
+    dates = [date for date in dates if date]
+    return max(dates) if dates else None
+
+
+class ConditionalGetMixin(object):
+    """ETag and Last-Modified handling for views of time stamped models.
+
+    Lists are versioned by the count and the latest ``modified_date`` of the
+    filtered queryset and by the latest deletion of the model, as a
+    deletion does not leave any newer ``modified_date`` behind. Details are
+    versioned by the object ``modified_date``. When the client copy is
+    still fresh a 304 is returned without serializing anything.
+    """
+
+    def get_list_version(self, queryset):
+        version = queryset.aggregate(
+            count=Count('pk'),
+            last_modified=Max('modified_date')
+        )
+        version['last_modified'] = latest(
+            version['last_modified'], last_deletion(queryset.model)
+        )
+        return version
+
+    def get_object_version(self, instance):
+        return {'pk': instance.pk, 'last_modified': instance.modified_date}
+
+    def conditional(self, request, version, view):
+        etag = make_etag(request.get_full_path(), *sorted(version.items()))
+        last_modified = version.get('last_modified')
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = view()
+        return set_conditional_headers(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        version = self.get_list_version(
+            self.filter_queryset(self.get_queryset())
+        )
+        parent = super(ConditionalGetMixin, self)
+        return self.conditional(
+            request, version, lambda: parent.list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        version = self.get_object_version(instance)
+        return self.conditional(
+            request,
+            version,
+            lambda: Response(self.get_serializer(instance).data)
+        )
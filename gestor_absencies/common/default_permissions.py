@@ -0,0 +1,59 @@
+from django.contrib.auth.models import Group, Permission
+
+
+DEFAULT_WORKER_GROUP = 'default_worker'
+
+DEFAULT_WORKER_PERMISSIONS = (
+    'view_worker',
+    'view_team',
+    'view_member',
+    'add_member',
+    'change_member',
+    'delete_member',
+    'view_somenergiaabsencetype',
+    'view_somenergiaabsence',
+    'add_somenergiaabsence',
+    'change_somenergiaabsence',
+    'delete_somenergiaabsence',
+)
+
+_group_id = None
+
+
+def get_default_group_id():
+    """Return the id of the group holding the default worker permissions.
+
+    The group is resolved the first time and kept for the rest of the
+    process. It is created with its permissions if it does not exist yet.
+    """
+    global _group_id
+    if _group_id is None:
+        group, created = Group.objects.get_or_create(
+            name=DEFAULT_WORKER_GROUP
+        )
+        if created:
+            group.permissions.set(
+                Permission.objects.filter(
+                    content_type__app_label='gestor_absencies',
+                    codename__in=DEFAULT_WORKER_PERMISSIONS
+                )
+            )
+        _group_id = group.pk
+    return _group_id
+
+
+def clear_default_group_cache():
+    global _group_id
+    _group_id = None
+
+
+def grant_default_permissions(workers):
+    """Add newly created workers to the default worker group."""
+    from gestor_absencies.models import Worker
+
+    group_id = get_default_group_id()
+    through = Worker.groups.through
+    through.objects.bulk_create([
+        through(worker_id=worker.pk, group_id=group_id)
+        for worker in workers
+    ])
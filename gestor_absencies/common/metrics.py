@@ -0,0 +1,223 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+from gestor_absencies.common.response_cache import get_response_cache_stats
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class ViewMetrics(object):
+
+    __slots__ = (
+        'requests', 'latency', 'queries', 'query_time', 'bytes', 'buckets'
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.latency = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.bytes = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class MetricsRegistry(object):
+    """Per (view, method, status) request metrics of this process."""
+
+    def __init__(self):
+        self._views = defaultdict(ViewMetrics)
+        self._lock = threading.Lock()
+
+    def observe(self, labels, latency, queries, query_time, size):
+        with self._lock:
+            metrics = self._views[labels]
+            metrics.requests += 1
+            metrics.latency += latency
+            metrics.queries += queries
+            metrics.query_time += query_time
+            metrics.bytes += size or 0
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    metrics.buckets[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                (labels, _copy(metrics))
+                for labels, metrics in sorted(self._views.items())
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+def _copy(metrics):
+    copy = ViewMetrics()
+    for field in ViewMetrics.__slots__:
+        value = getattr(metrics, field)
+        setattr(copy, field, list(value) if field == 'buckets' else value)
+    return copy
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter(object):
+    """Database execute wrapper counting and timing queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - start
+
+
+class MetricsMiddleware(object):
+    """Record latency, queries and payload size of every request.
+
+    Requests are labelled with the name of the matched URL (``workers``,
+    ``teams_detail``...), their method and their status. The totals are
+    served by ``/absencies/metrics`` and each request is logged as a JSON
+    line by the ``gestor_absencies.common.metrics`` logger, which LOGGING
+    sends to its own ``metrics`` handler instead of the console. Streamed
+    responses are not read, so their size and the queries run while
+    streaming are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'ABSENCIES_METRICS', True):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        latency = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.url_name if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            (view, request.method, response.status_code),
+            latency,
+            counter.count,
+            counter.time,
+            size
+        )
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                'latency_ms': round(latency * 1000, 2),
+                'queries': counter.count,
+                'query_ms': round(counter.time * 1000, 2),
+                'bytes': size,
+            }))
+        return response
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace(
+        '"', '\\"'
+    ).replace('\n', '\\n')
+
+
+def format_labels(**labels):
+    return '{' + ','.join(
+        '{}="{}"'.format(name, escape_label(value))
+        for name, value in sorted(labels.items())
+    ) + '}'
+
+
+def render_metrics():
+    """Return the metrics of this process in Prometheus text format."""
+    views = registry.snapshot()
+    lines = []
+
+    def metric(name, kind, description, samples):
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} {}'.format(name, kind))
+        for suffix, labels, value in samples:
+            lines.append('{}{}{} {}'.format(
+                name, suffix, format_labels(**labels), value
+            ))
+
+    def view_labels(labels):
+        view, method, status = labels
+        return {'view': view, 'method': method, 'status': status}
+
+    metric(
+        'gestor_absencies_requests_total', 'counter', 'Requests served.',
+        [('', view_labels(labels), metrics.requests)
+         for labels, metrics in views]
+    )
+
+    histogram = []
+    for labels, metrics in views:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+            cumulative += count
+            histogram.append((
+                '_bucket', dict(view_labels(labels), le=bound), cumulative
+            ))
+        histogram.append((
+            '_bucket', dict(view_labels(labels), le='+Inf'), metrics.requests
+        ))
+        histogram.append(('_sum', view_labels(labels), metrics.latency))
+        histogram.append(('_count', view_labels(labels), metrics.requests))
+    metric(
+        'gestor_absencies_request_duration_seconds', 'histogram',
+        'Time spent serving requests.', histogram
+    )
+
+    metric(
+        'gestor_absencies_request_queries_total', 'counter',
+        'SQL queries run by requests.',
+        [('', view_labels(labels), metrics.queries)
+         for labels, metrics in views]
+    )
+    metric(
+        'gestor_absencies_request_query_seconds_total', 'counter',
+        'Time spent in SQL queries by requests.',
+        [('', view_labels(labels), metrics.query_time)
+         for labels, metrics in views]
+    )
+    metric(
+        'gestor_absencies_response_bytes_total', 'counter',
+        'Size of the non streamed response bodies.',
+        [('', view_labels(labels), metrics.bytes)
+         for labels, metrics in views]
+    )
+    metric(
+        'gestor_absencies_response_cache_requests_total', 'counter',
+        'Lookups in the response cache.',
+        [('', {'namespace': namespace, 'result': result}, count)
+         for (namespace, result), count
+         in sorted(get_response_cache_stats().items())]
+    )
+    return '\n'.join(lines) + '\n'
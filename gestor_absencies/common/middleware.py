@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request):
+    """True for requests to the JSON API while ABSENCIES_API_MODE is on."""
+    return getattr(settings, 'ABSENCIES_API_MODE', False) and (
+        request.path_info.startswith(
+            getattr(settings, 'ABSENCIES_API_PREFIX', '/absencies/')
+        )
+    )
+
+
+class ApiExemptMixin(object):
+    """Skip a browser oriented middleware for API requests.
+
+    The API authenticates every request with a token (or basic
+    credentials), so sessions, messages, CSRF and frame options only cost
+    time there. Other paths (admin, token views) keep the full behaviour.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super(ApiExemptMixin, self).__call__(request)
+
+
+class ApiSessionMiddleware(ApiExemptMixin, SessionMiddleware):
+    pass
+
+
+class ApiCsrfViewMiddleware(ApiExemptMixin, CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super(ApiCsrfViewMiddleware, self).process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class ApiAuthenticationMiddleware(ApiExemptMixin, AuthenticationMiddleware):
+    pass
+
+
+class ApiMessageMiddleware(ApiExemptMixin, MessageMiddleware):
+    pass
+
+
+class ApiXFrameOptionsMiddleware(ApiExemptMixin, XFrameOptionsMiddleware):
+    pass
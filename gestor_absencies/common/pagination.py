@@ -0,0 +1,37 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class AbsenciesCursorPagination(CursorPagination):
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'ABSENCIES_CURSOR_MAX_PAGE_SIZE', 1000)
+
+
+class CursorPaginationMixin(object):
+    """Let clients opt in to cursor pagination on a list endpoint.
+
+    Requests with ``pagination=cursor`` (or a ``cursor`` returned by a
+    previous page) are paginated by ``cursor_ordering`` instead of page
+    number, which avoids the COUNT(*) and the OFFSET scan of deep pages.
+    ``cursor_ordering`` must be a unique, indexed field.
+    """
+
+    cursor_pagination_class = AbsenciesCursorPagination
+    cursor_ordering = 'pk'
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if not self.use_cursor_pagination():
+                return super(CursorPaginationMixin, self).paginator
+            self._paginator = self.cursor_pagination_class()
+            self._paginator.ordering = self.cursor_ordering
+        return self._paginator
@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_hash_workers():
+    return getattr(settings, 'ABSENCIES_PASSWORD_HASH_WORKERS', 0)
+
+
+def get_executor(workers):
+    with _lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='password-hash'
+            )
+        return _executors[workers]
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash a list of raw passwords with the configured hasher.
+
+    With ABSENCIES_PASSWORD_HASH_WORKERS (or ``workers``) above zero the
+    hashes are computed in a shared thread pool. The PBKDF2, bcrypt and
+    argon2 implementations release the GIL, so a batch is hashed in parallel.
+    """
+    if workers is None:
+        workers = get_hash_workers()
+    if workers and len(passwords) > 1:
+        return list(get_executor(workers).map(make_password, passwords))
+    return [make_password(password) for password in passwords]
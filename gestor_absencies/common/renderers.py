@@ -0,0 +1,30 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamRenderer(BaseRenderer):
+    """Content type of views streaming their own response.
+
+    It lets content negotiation accept the type, the body being written by
+    the view. Only the errors raised before streaming are rendered here, as
+    plain text.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(
+                '{}: {}'.format(key, value) for key, value in data.items()
+            )
+        return str(data).encode(self.charset)
+
+
+class CalendarRenderer(StreamRenderer):
+    media_type = 'text/calendar'
+    format = 'ics'
+
+
+class CSVRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
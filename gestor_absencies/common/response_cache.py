@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from gestor_absencies.common.absencies_perm import get_cached_permissions
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'ABSENCIES_RESPONSE_CACHE', 'default')]
+
+
+def get_response_cache_stats():
+    """Return the {(namespace, 'hits' or 'misses'): count} of this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def count(namespace, result):
+    with _stats_lock:
+        _stats[namespace, result] += 1
+
+
+def version_key(namespace):
+    return 'gestor_absencies:response:{}:version'.format(namespace)
+
+
+def get_version(namespace):
+    cache = get_response_cache()
+    version = cache.get(version_key(namespace))
+    if version is None:
+        cache.add(version_key(namespace), int(time.time() * 1000), None)
+        version = cache.get(version_key(namespace))
+    return version
+
+
+def invalidate_responses(namespace):
+    cache = get_response_cache()
+    try:
+        cache.incr(version_key(namespace))
+    except ValueError:
+        cache.set(version_key(namespace), int(time.time() * 1000), None)
+
+
+def invalidate_responses_on_commit(namespace):
+    """Invalidate now and once more when the current transaction commits.
+
+    Until the commit, concurrent requests still read the rows as they were
+    and may cache them under the new version; the second bump drops them.
+    """
+    invalidate_responses(namespace)
+    transaction.on_commit(lambda: invalidate_responses(namespace))
+
+
+def permissions_digest(user):
+    """Digest of what a user may see, so users with other rights never
+    share cached responses."""
+    if user.is_superuser:
+        permissions = ['*']
+    else:
+        permissions = sorted(get_cached_permissions(user))
+    return hashlib.md5(
+        '|'.join(permissions).encode('utf-8')
+    ).hexdigest()
+
+
+class CachedResponseMixin(object):
+    """Cache the list and detail responses of read-mostly reference data.
+
+    Responses are stored in the cache named by ABSENCIES_RESPONSE_CACHE,
+    keyed by model, a per-model version, the permission set of the user and
+    the request URL. Writes through the viewset (and model signals) bump the
+    version once committed, which invalidates every entry of the model at
+    once.
+    """
+
+    response_cache_timeout = 60 * 60
+
+    def get_cache_namespace(self):
+        return self.queryset.model._meta.label_lower
+
+    def get_cache_key(self, request):
+        namespace = self.get_cache_namespace()
+        url = hashlib.md5(
+            request.build_absolute_uri().encode('utf-8')
+        ).hexdigest()
+        return 'gestor_absencies:response:{}:{}:{}:{}'.format(
+            namespace,
+            get_version(namespace),
+            permissions_digest(request.user),
+            url
+        )
+
+    def cached(self, request, view):
+        namespace = self.get_cache_namespace()
+        cache = get_response_cache()
+        key = self.get_cache_key(request)
+
+        cached = cache.get(key)
+        if cached is None:
+            count(namespace, 'misses')
+            response = view()
+            if response.status_code == 200:
+                headers = {
+                    header: response[header]
+                    for header in ('ETag', 'Last-Modified')
+                    if response.has_header(header)
+                }
+                cache.set(
+                    key, (response.data, headers), self.response_cache_timeout
+                )
+            return response
+
+        count(namespace, 'hits')
+        data, headers = cached
+        response = get_conditional_response(
+            request,
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(
+                headers.get('Last-Modified', '')
+            )
+        )
+        if response is None:
+            response = Response(data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        parent = super(CachedResponseMixin, self)
+        return self.cached(
+            request, lambda: parent.list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        parent = super(CachedResponseMixin, self)
+        return self.cached(
+            request, lambda: parent.retrieve(request, *args, **kwargs)
+        )
+
+    def perform_create(self, serializer):
+        super(CachedResponseMixin, self).perform_create(serializer)
+        invalidate_responses_on_commit(self.get_cache_namespace())
+
+    def perform_update(self, serializer):
+        super(CachedResponseMixin, self).perform_update(serializer)
+        invalidate_responses_on_commit(self.get_cache_namespace())
+
+    def perform_destroy(self, instance):
+        super(CachedResponseMixin, self).perform_destroy(instance)
+        invalidate_responses_on_commit(self.get_cache_namespace())
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def get_version_cache():
+    return caches[getattr(settings, 'ABSENCIES_VERSION_CACHE', 'default')]
+
+
+class VersionedCache(object):
+    """In-process cache invalidated through a version kept in Django's cache.
+
+    Entries live in a plain dict of the current process, so a hit costs no
+    database query. Every lookup compares the local version with the one in
+    the ABSENCIES_VERSION_CACHE backend, which lets ``invalidate`` drop the
+    entries of every process sharing that backend.
+
+    With a per-process backend such as LocMemCache, other processes never
+    see the new version. Entries are then only as fresh as
+    ABSENCIES_VERSIONED_CACHE_TTL, after which they are loaded again.
+    """
+
+    def __init__(self, name, max_entries=10000):
+        self.version_key = 'gestor_absencies:{}:version'.format(name)
+        self.max_entries = max_entries
+        self._entries = {}
+        self._version = None
+        self._loaded = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        cache = get_version_cache()
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get(self, key, loader):
+        version = self.current_version()
+        ttl = getattr(settings, 'ABSENCIES_VERSIONED_CACHE_TTL', 60)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version or now - self._loaded >= ttl:
+                self._entries = {}
+                self._version = version
+                self._loaded = now
+            try:
+                return self._entries[key]
+            except KeyError:
+                pass
+
+        value = loader()
+        with self._lock:
+            if version == self._version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries = {}
+                self._entries[key] = value
+        return value
+
+    def invalidate(self):
+        cache = get_version_cache()
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, int(time.time() * 1000), None)
+        with self._lock:
+            self._entries = {}
+            self._version = None
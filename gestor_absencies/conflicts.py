@@ -0,0 +1,73 @@
+from bisect import bisect_right
+
+from .models import Member, SomEnergiaAbsence, SomEnergiaOccurrence
+
+
+def overlapping(occurrences, times):
+    """Keep the occurrences overlapping any of the (start, end) pairs.
+
+    ``times`` come from a recurrence, so once sorted by start their ends are
+    sorted too and every occurrence is checked with a binary search.
+    """
+    times = sorted(times)
+    ends = [end for _, end in times]
+    result = []
+    for occurrence in occurrences:
+        position = bisect_right(ends, occurrence['start_time'])
+        if position < len(times) and \
+           times[position][0] < occurrence['end_time']:
+            result.append(occurrence)
+    return result
+
+
+def occurrences_in_range(times):
+    """Occurrences overlapping the range spanned by the (start, end) pairs."""
+    return SomEnergiaOccurrence.objects.filter(
+        start_time__lt=max(end for _, end in times),
+        end_time__gt=min(start for start, _ in times),
+    ).order_by('start_time')
+
+
+def find_conflicts(worker, times, exclude_absence=None):
+    """Return the occurrences of a worker overlapping the requested ones.
+
+    A single range query fetches the candidates. The (event, start_time,
+    end_time) index on swingtime occurrences serves it with an index range
+    scan per absence of the worker.
+    """
+    if not times:
+        return []
+    absences = SomEnergiaAbsence.objects.filter(worker=worker).exclude(
+        status=SomEnergiaAbsence.REJECTED
+    )
+    if exclude_absence is not None:
+        absences = absences.exclude(pk=exclude_absence.pk)
+    occurrences = occurrences_in_range(times).filter(
+        event__in=absences.values('pk')
+    )
+    return overlapping(
+        occurrences.values('absence', 'start_time', 'end_time'),
+        times
+    )
+
+
+def find_teammates_off(worker, times):
+    """Return the occurrences of teammates overlapping the requested ones."""
+    if not times:
+        return []
+    teams = Member.objects.filter(worker=worker).values('team')
+    absences = SomEnergiaAbsence.objects.filter(
+        worker__member__team__in=teams
+    ).exclude(worker=worker).exclude(status=SomEnergiaAbsence.REJECTED)
+    occurrences = occurrences_in_range(times).filter(
+        event__in=absences.values('pk')
+    ).values('absence__worker', 'absence', 'start_time', 'end_time')
+    return [
+        {
+            'worker': occurrence['absence__worker'],
+            'absence': occurrence['absence'],
+            'start_time': occurrence['start_time'],
+            'end_time': occurrence['end_time'],
+        }
+        for occurrence in overlapping(occurrences, times)
+    ]
@@ -0,0 +1,273 @@
+from datetime import date, datetime, time, timedelta
+from itertools import compress
+from random import Random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from gestor_absencies.common.bulk import (
+    bulk_create_inherited,
+    bulk_create_with_pks
+)
+from gestor_absencies.common.default_permissions import (
+    grant_default_permissions
+)
+
+from .absences import occurrence_times
+from .balances import days_by_year
+from .models import (
+    HolidayBalance,
+    Member,
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    SomEnergiaOccurrence,
+    Team,
+    VacationPolicy,
+    Worker
+)
+from .rules import validate_durations
+
+BATCH_SIZE = 1000
+
+DEFAULT_PASSWORD = 'password'
+
+# name, holidays, share of the workers
+VACATION_POLICIES = (
+    ('Jornada completa', 25, 0.7),
+    ('Jornada reduïda', 20, 0.2),
+    ('Antiguitat', 28, 0.1),
+)
+
+# abbr, label, spend_days, min_duration, max_duration
+ABSENCE_TYPES = (
+    ('vacn', 'Vacances', True, 0.5, -1),
+    ('pers', 'Assumptes propis', True, 0.5, 1),
+    ('baix', 'Baixa', False, 0.5, -1),
+    ('form', 'Formació', False, 0.5, 5),
+)
+
+
+class DatasetGenerator(object):
+    """Fill the database with a synthetic company.
+
+    Workers get a vacation policy, one team (some of them two) and, for
+    every year, a few holiday periods, personal days and sick leaves, with
+    one occurrence per day. Team sizes follow a long tailed distribution
+    and the first two members of each team are its referent and its
+    representant. Everything is inserted with bulk operations, workers being
+    processed in batches so memory stays bounded, and the holiday balance
+    ledger is filled as the absences are created. The same seed and years
+    always give the same company.
+    """
+
+    def __init__(self, workers, teams, years, seed=0, first_year=None,
+                 batch_size=BATCH_SIZE, prefix='worker'):
+        self.workers = workers
+        self.teams = teams
+        self.years = years
+        self.first_year = first_year or (
+            timezone.now().year - years + 1
+        )
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.random = Random(seed)
+        self.counts = dict.fromkeys(
+            ('workers', 'teams', 'members', 'absences', 'occurrences'), 0
+        )
+        self.team_members = {}
+
+    def run(self):
+        with transaction.atomic():
+            self.absence_types = self.create_absence_types()
+            self.policies = self.create_vacation_policies()
+            teams = self.create_teams()
+            password = make_password(DEFAULT_PASSWORD)
+            for start in range(0, self.workers, self.batch_size):
+                size = min(self.batch_size, self.workers - start)
+                workers = self.create_workers(start, size, password)
+                self.create_members(workers, teams)
+                self.create_absences(workers)
+        return self.counts
+
+    def create_vacation_policies(self):
+        policies = []
+        for name, holidays, share in VACATION_POLICIES:
+            policy = VacationPolicy.objects.filter(name=name).first()
+            if policy is None:
+                policy = VacationPolicy.objects.create(
+                    name=name, holidays=holidays
+                )
+            policies.append((policy, share))
+        return policies
+
+    def create_absence_types(self):
+        absence_types = {}
+        for abbr, label, spend_days, min_duration, max_duration in (
+                ABSENCE_TYPES):
+            absence_types[abbr], _ = SomEnergiaAbsenceType.objects.get_or_create(
+                abbr=abbr,
+                defaults={
+                    'label': label,
+                    'spend_days': spend_days,
+                    'min_duration': min_duration,
+                    'max_duration': max_duration,
+                }
+            )
+        return absence_types
+
+    def create_teams(self):
+        teams = bulk_create_inherited(Team, [
+            Team(
+                name='Team {}'.format(i + 1),
+                min_worker=self.random.randint(0, 2)
+            )
+            for i in range(self.teams)
+        ])
+        self.team_weights = [
+            self.random.paretovariate(1.2) for _ in teams
+        ]
+        self.counts['teams'] += len(teams)
+        return teams
+
+    def create_workers(self, start, size, password):
+        policies = [policy for policy, _ in self.policies]
+        shares = [share for _, share in self.policies]
+        workers = bulk_create_with_pks(Worker, [
+            Worker(
+                username='{}{:06d}'.format(self.prefix, start + i + 1),
+                first_name='Worker',
+                last_name='{:06d}'.format(start + i + 1),
+                email='{}{:06d}@example.com'.format(
+                    self.prefix, start + i + 1
+                ),
+                password=password,
+                vacation_policy_id=self.random.choices(
+                    policies, weights=shares
+                )[0].pk,
+            )
+            for i in range(size)
+        ])
+        grant_default_permissions(workers)
+        self.counts['workers'] += len(workers)
+        return workers
+
+    def create_members(self, workers, teams):
+        if not teams:
+            return
+        members = []
+        for worker in workers:
+            worker_teams = self.random.choices(
+                teams,
+                weights=self.team_weights,
+                k=2 if self.random.random() < 0.2 else 1
+            )
+            for team in sorted(set(worker_teams), key=lambda t: t.pk):
+                position = self.team_members.get(team.pk, 0)
+                self.team_members[team.pk] = position + 1
+                members.append(Member(
+                    worker_id=worker.pk,
+                    team_id=team.pk,
+                    is_referent=position == 0,
+                    is_representant=position == 1,
+                ))
+        Member.objects.bulk_create(members)
+        self.counts['members'] += len(members)
+
+    def absence_periods(self, year):
+        """(abbr, day of the year, days, hours a day) of a worker's year.
+
+        Periods are laid out in order, one after the other with random gaps
+        between them, so they never overlap nor run into the next year.
+        """
+        periods = []
+        for _ in range(self.random.randint(3, 5)):
+            periods.append(('vacn', self.random.randint(1, 10), 8))
+        for _ in range(self.random.randint(0, 3)):
+            periods.append(('pers', 1, self.random.choice((4, 8))))
+        for _ in range(self.random.randint(0, 2)):
+            periods.append(('baix', self.random.randint(1, 5), 8))
+        self.random.shuffle(periods)
+
+        year_days = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        free_days = year_days - sum(days for _, days, _ in periods)
+        gaps = sorted(self.random.randint(0, free_days) for _ in periods)
+        slots = []
+        taken_days = 0
+        for (abbr, days, hours), gap in zip(periods, gaps):
+            slots.append((abbr, gap + taken_days, days, hours))
+            taken_days += days
+        return slots
+
+    def create_absences(self, workers):
+        absences = []
+        times = []
+        for worker in workers:
+            for year in range(self.first_year, self.first_year + self.years):
+                for abbr, day, days, hours in self.absence_periods(year):
+                    start_time = timezone.make_aware(datetime.combine(
+                        datetime(year, 1, 1) + timedelta(days=day), time(9)
+                    ))
+                    absence_type = self.absence_types[abbr]
+                    absences.append(SomEnergiaAbsence(
+                        title=absence_type.label[:32],
+                        description='',
+                        event_type_id=absence_type.pk,
+                        absence_type_id=absence_type.pk,
+                        worker_id=worker.pk,
+                        status=SomEnergiaAbsence.APPROVED,
+                    ))
+                    times.append(occurrence_times(
+                        start_time,
+                        start_time + timedelta(hours=hours),
+                        freq='daily',
+                        count=days
+                    ))
+
+        # absences breaking the bounds of their type are not generated
+        valid = [
+            not errors for errors in validate_durations(
+                (absence.absence_type_id, absence_times)
+                for absence, absence_times in zip(absences, times)
+            )
+        ]
+        absences = list(compress(absences, valid))
+        times = list(compress(times, valid))
+
+        bulk_create_inherited(SomEnergiaAbsence, absences)
+
+        occurrences = [
+            SomEnergiaOccurrence(
+                event_id=absence.pk,
+                absence_id=absence.pk,
+                start_time=start,
+                end_time=end
+            )
+            for absence, absence_times in zip(absences, times)
+            for start, end in absence_times
+        ]
+        bulk_create_inherited(SomEnergiaOccurrence, occurrences)
+
+        self.create_balances(absences, times)
+        self.counts['absences'] += len(absences)
+        self.counts['occurrences'] += len(occurrences)
+
+    def create_balances(self, absences, times):
+        spending = {
+            absence_type.pk
+            for absence_type in self.absence_types.values()
+            if absence_type.spend_days
+        }
+        spent = {}
+        for absence, absence_times in zip(absences, times):
+            if absence.absence_type_id not in spending:
+                continue
+            for year, days in days_by_year(absence_times).items():
+                key = (absence.worker_id, year)
+                spent[key] = spent.get(key, 0) + days
+        HolidayBalance.objects.bulk_create(
+            [
+                HolidayBalance(worker_id=worker_id, year=year, spent_days=days)
+                for (worker_id, year), days in spent.items()
+            ]
+        )
@@ -0,0 +1,199 @@
+import codecs
+import csv
+import json
+
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from rest_framework import serializers
+
+from gestor_absencies.common.default_permissions import (
+    grant_default_permissions
+)
+from gestor_absencies.common.passwords import hash_passwords
+from .models import Member, Team, Worker
+
+IMPORT_BATCH_SIZE = 500
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+class TeamListField(serializers.ListField):
+    """List of team ids, also accepting the 'id;id' form used in CSV files."""
+
+    child = serializers.IntegerField()
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [team for team in data.split(';') if team.strip()]
+        return super(TeamListField, self).to_internal_value(data)
+
+
+class WorkerImportSerializer(serializers.Serializer):
+    username = serializers.CharField(
+        max_length=150,
+        validators=[UnicodeUsernameValidator()]
+    )
+    first_name = serializers.CharField(
+        max_length=30, required=False, allow_blank=True
+    )
+    last_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(max_length=128)
+    teams = TeamListField(required=False)
+
+
+def get_import_format(upload, file_format=None):
+    if file_format:
+        return file_format
+    if upload.name.endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def decode_lines(upload, invalid_lines):
+    """Decode the lines of an upload as UTF-8, dropping a leading BOM.
+
+    Lines that are not valid UTF-8 are decoded with replacement characters
+    and their numbers added to ``invalid_lines``.
+    """
+    for line_number, line in enumerate(upload, start=1):
+        if line_number == 1 and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        try:
+            yield line.decode('utf-8')
+        except UnicodeDecodeError:
+            invalid_lines.add(line_number)
+            yield line.decode('utf-8', 'replace')
+
+
+def read_rows(upload, file_format):
+    """Yield (row number, data) pairs from an uploaded CSV or JSON-lines file.
+
+    The upload is read line by line, never loaded as a whole. Rows that
+    cannot be decoded yield a ValueError instead of a dict.
+    """
+    invalid_lines = set()
+    lines = decode_lines(upload, invalid_lines)
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        first_line = 2
+        for data in reader:
+            if any(line in invalid_lines
+                   for line in range(first_line, reader.line_num + 1)):
+                data = ValueError('Invalid UTF-8 text.')
+            yield reader.line_num, data
+            first_line = reader.line_num + 1
+        return
+
+    for row_number, line in enumerate(lines, start=1):
+        if row_number in invalid_lines:
+            yield row_number, ValueError('Invalid UTF-8 text.')
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row_number, ValueError('Invalid JSON line.')
+            continue
+        if not isinstance(data, dict):
+            data = ValueError('Expected a JSON object.')
+        yield row_number, data
+
+
+class WorkerImport(object):
+    """Validate worker rows in batches and insert every batch in bulk."""
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.created = 0
+        self.errors = []
+        self._seen_usernames = set()
+
+    def run(self, rows):
+        batch = []
+        for row_number, data in rows:
+            if isinstance(data, Exception):
+                self.add_error(row_number, {'non_field_errors': [str(data)]})
+                continue
+            serializer = WorkerImportSerializer(data=data)
+            if not serializer.is_valid():
+                self.add_error(row_number, serializer.errors)
+                continue
+            batch.append((row_number, serializer.validated_data))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        self.errors.sort(key=lambda error: error['row'])
+        return self
+
+    def add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def flush(self, batch):
+        usernames = [data['username'] for _, data in batch]
+        existing_usernames = set(
+            Worker.objects.filter(
+                username__in=usernames
+            ).values_list('username', flat=True)
+        )
+        team_ids = set(
+            Team.objects.filter(
+                pk__in={team for _, data in batch
+                        for team in data.get('teams', [])}
+            ).values_list('pk', flat=True)
+        )
+
+        valid = []
+        for row_number, data in batch:
+            username = data['username']
+            unknown_teams = set(data.get('teams', [])) - team_ids
+            if username in existing_usernames or \
+               username in self._seen_usernames:
+                self.add_error(row_number, {
+                    'username': ['A user with that username already exists.']
+                })
+            elif unknown_teams:
+                self.add_error(row_number, {
+                    'teams': ['Invalid team id {}.'.format(team)
+                              for team in sorted(unknown_teams)]
+                })
+            else:
+                self._seen_usernames.add(username)
+                valid.append(data)
+
+        if valid:
+            self.create(valid)
+
+    def create(self, rows):
+        passwords = hash_passwords([data['password'] for data in rows])
+        workers = [
+            Worker(
+                username=data['username'],
+                first_name=data.get('first_name', ''),
+                last_name=data.get('last_name', ''),
+                email=data.get('email', ''),
+                password=password,
+            )
+            for data, password in zip(rows, passwords)
+        ]
+        with transaction.atomic():
+            Worker.objects.bulk_create(workers)
+            worker_ids = dict(
+                Worker.objects.filter(
+                    username__in=[worker.username for worker in workers]
+                ).values_list('username', 'id')
+            )
+            for worker in workers:
+                worker.pk = worker_ids[worker.username]
+            grant_default_permissions(workers)
+            Member.objects.bulk_create([
+                Member(worker=worker, team_id=team)
+                for worker, data in zip(workers, rows)
+                for team in data.get('teams', [])
+            ])
+        self.created += len(workers)
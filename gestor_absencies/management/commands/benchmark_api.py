@@ -0,0 +1,246 @@
+import json
+import math
+import platform
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_jwt.settings import api_settings
+
+from gestor_absencies.datasets import DatasetGenerator
+from gestor_absencies.models import (
+    Member,
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    Team,
+    VacationPolicy,
+    Worker
+)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def first_pk(model):
+    return model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+def get_endpoints():
+    """(name, path, query params) of every benchmarked request."""
+    team = first_pk(Team)
+    year = timezone.now().year
+    # steady state polling, nothing changed since the previous sync
+    since = timezone.now().isoformat()
+    endpoints = [
+        ('workers', reverse('workers'), {}),
+        ('workers_cursor', reverse('workers'), {'pagination': 'cursor'}),
+        ('workers_detail',
+         reverse('workers_detail', kwargs={'pk': first_pk(Worker)}), {}),
+        ('workers_calendar',
+         reverse('workers_calendar', kwargs={'pk': first_pk(Worker)}), {}),
+        ('teams', reverse('teams'), {}),
+        ('teams_detail', reverse('teams_detail', kwargs={'pk': team}), {}),
+        ('teams_availability',
+         reverse('teams_availability', kwargs={'pk': team}),
+         {'start': '{}-01-01'.format(year), 'end': '{}-03-31'.format(year)}),
+        ('teams_calendar',
+         reverse('teams_calendar', kwargs={'pk': team}), {}),
+        ('members', reverse('members'), {}),
+        ('members_expanded', reverse('members'), {'expand': 'worker,team'}),
+        ('members_detail',
+         reverse('members_detail', kwargs={'pk': first_pk(Member)}), {}),
+        ('vacationpolicy', reverse('vacationpolicy'), {}),
+        ('absencetype', reverse('absencetype'), {}),
+        ('absences', reverse('absences'), {}),
+        ('absences_month', reverse('absences'),
+         {'start': '{}-03-01'.format(year), 'end': '{}-04-01'.format(year)}),
+        ('absences_detail', reverse(
+            'absences_detail', kwargs={'pk': first_pk(SomEnergiaAbsence)}
+        ), {}),
+        ('sync', reverse('sync'), {'since': since}),
+        ('reports_absences', reverse('reports_absences'),
+         {'year': year, 'group_by': 'team,type,month'}),
+        ('reports_absences_csv', reverse('reports_absences'),
+         {'year': year, 'group_by': 'team,type,month', 'output': 'csv'}),
+    ]
+    if VacationPolicy.objects.exists():
+        endpoints.append((
+            'vacationpolicy_detail',
+            reverse('vacationpolicy_detail',
+                    kwargs={'pk': first_pk(VacationPolicy)}),
+            {}
+        ))
+    if SomEnergiaAbsenceType.objects.exists():
+        endpoints.append((
+            'absencetype_detail',
+            reverse('absencetype_detail',
+                    kwargs={'pk': first_pk(SomEnergiaAbsenceType)}),
+            {}
+        ))
+    return endpoints
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic company in a throwaway test database and report '
+        'the latency percentiles and throughput of every API endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2000)
+        parser.add_argument('--teams', type=int, default=200)
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Only benchmark this endpoint (repeatable).'
+        )
+        parser.add_argument(
+            '--output', help='Write the results to this JSON file.'
+        )
+        parser.add_argument(
+            '--compare', help='JSON results of a previous run to compare to.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results, options.get('compare'))
+        if options.get('output'):
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write('Results written to {}'.format(
+                options['output']
+            ))
+
+    def run(self, options):
+        start = time.perf_counter()
+        counts = DatasetGenerator(
+            workers=options['workers'],
+            teams=options['teams'],
+            years=options['years'],
+            seed=options['seed'],
+        ).run()
+        self.stdout.write('Seeded {} in {:.1f}s'.format(
+            ', '.join('{} {}'.format(n, name) for name, n in counts.items()),
+            time.perf_counter() - start
+        ))
+
+        admin = Worker.objects.create_superuser(
+            'benchmark_api', 'benchmark_api@example.com', 'password'
+        )
+        token = api_settings.JWT_ENCODE_HANDLER(
+            api_settings.JWT_PAYLOAD_HANDLER(admin)
+        )
+        client = Client(HTTP_AUTHORIZATION='JWT ' + token)
+
+        endpoints = [
+            endpoint for endpoint in get_endpoints()
+            if not options['endpoints'] or endpoint[0] in options['endpoints']
+        ]
+        results = {}
+        with override_settings(ABSENCIES_API_MODE=True):
+            for name, path, params in endpoints:
+                results[name] = self.measure(
+                    client, path, params, options['requests'],
+                    options['warmup']
+                )
+
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'date': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'dataset': dict(
+                    counts, seed=options['seed'], years=options['years']
+                ),
+                'requests': options['requests'],
+            },
+            'results': results,
+        }
+
+    def measure(self, client, path, params, requests, warmup):
+        for _ in range(warmup):
+            self.get(client, path, params)
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            self.get(client, path, params)
+            latencies.append(time.perf_counter() - request_start)
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'max_ms': round(latencies[-1] * 1000, 3),
+            'requests_per_second': round(requests / elapsed, 1),
+        }
+
+    def get(self, client, path, params):
+        response = client.get(path, params)
+        if response.status_code != 200:
+            raise RuntimeError('{} answered {}'.format(
+                path, response.status_code
+            ))
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    def report(self, results, compare=None):
+        previous = {}
+        if compare:
+            with open(compare) as previous_file:
+                previous = json.load(previous_file)['results']
+
+        self.stdout.write('{:<24} {:>9} {:>9} {:>9} {:>10} {:>9}'.format(
+            'endpoint', 'p50 ms', 'p95 ms', 'p99 ms', 'req/s',
+            'p50 diff' if previous else ''
+        ))
+        for name, result in results['results'].items():
+            diff = ''
+            if name in previous and previous[name]['p50_ms']:
+                diff = '{:+.1f}%'.format(
+                    (result['p50_ms'] / previous[name]['p50_ms'] - 1) * 100
+                )
+            self.stdout.write(
+                '{:<24} {:>9.2f} {:>9.2f} {:>9.2f} {:>10.1f} {:>9}'.format(
+                    name, result['p50_ms'], result['p95_ms'],
+                    result['p99_ms'], result['requests_per_second'], diff
+                )
+            )
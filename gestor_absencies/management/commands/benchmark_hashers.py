@@ -0,0 +1,62 @@
+import time
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from gestor_absencies.common.passwords import hash_passwords
+from gestor_absencies.models import Worker
+
+HASHERS = (
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure worker creations per second for each password hasher.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=200)
+        parser.add_argument(
+            '--threads', type=int, nargs='+', default=[0, 4],
+            help='Hashing thread pool sizes to measure (0 = request thread).'
+        )
+
+    def handle(self, *args, **options):
+        count = options['workers']
+        passwords = ['password{}'.format(i) for i in range(count)]
+
+        self.stdout.write('{:<55} {:>8} {:>12}'.format(
+            'hasher', 'threads', 'workers/s'
+        ))
+        for hasher in HASHERS:
+            with override_settings(PASSWORD_HASHERS=[hasher]):
+                try:
+                    get_hasher().encode('password', get_hasher().salt())
+                except ValueError as error:
+                    self.stdout.write('{:<55} skipped: {}'.format(
+                        hasher, error
+                    ))
+                    continue
+
+                for threads in options['threads']:
+                    # the workers are inserted for real, then rolled back
+                    with transaction.atomic():
+                        start = time.perf_counter()
+                        hashes = hash_passwords(passwords, workers=threads)
+                        Worker.objects.bulk_create([
+                            Worker(
+                                username='benchmark-worker{}'.format(i),
+                                password=hashed
+                            )
+                            for i, hashed in enumerate(hashes)
+                        ])
+                        elapsed = time.perf_counter() - start
+                        transaction.set_rollback(True)
+                    self.stdout.write('{:<55} {:>8} {:>12.1f}'.format(
+                        hasher, threads, count / elapsed
+                    ))
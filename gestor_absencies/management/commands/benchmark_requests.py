@@ -0,0 +1,98 @@
+import base64
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.views import APIView
+from rest_framework_jwt.settings import api_settings
+
+from gestor_absencies.common.authentication import clear_credential_caches
+from gestor_absencies.models import Worker
+
+FULL_STACK_AUTHENTICATION = (
+    'rest_framework_jwt.authentication.JSONWebTokenAuthentication',
+    'rest_framework.authentication.SessionAuthentication',
+    'rest_framework.authentication.BasicAuthentication',
+)
+
+API_MODE_AUTHENTICATION = (
+    'gestor_absencies.common.authentication.CachedJSONWebTokenAuthentication',
+    'gestor_absencies.common.authentication.CachedBasicAuthentication',
+)
+
+MODES = (
+    ('full stack', False, FULL_STACK_AUTHENTICATION),
+    ('api mode', True, API_MODE_AUTHENTICATION),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-request overhead of the middleware and '
+        'authentication chain, with and without ABSENCIES_API_MODE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--url', default=None,
+            help='Path to request, the absence type list by default.'
+        )
+
+    def handle(self, *args, **options):
+        url = options['url'] or reverse('absencetype')
+        count = options['requests']
+
+        self.stdout.write('{:<12} {:<8} {:>12} {:>10}'.format(
+            'mode', 'auth', 'requests/s', 'ms/req'
+        ))
+        with transaction.atomic():
+            worker = Worker(username='benchmark_requests')
+            worker.set_password('password')
+            worker.save()
+            credentials = {
+                'jwt': 'JWT ' + api_settings.JWT_ENCODE_HANDLER(
+                    api_settings.JWT_PAYLOAD_HANDLER(worker)
+                ),
+                'basic': 'Basic ' + base64.b64encode(
+                    b'benchmark_requests:password'
+                ).decode('ascii'),
+            }
+
+            for mode, api_mode, authentication in MODES:
+                # views read their authentication classes at import time
+                classes = [import_string(path) for path in authentication]
+                with override_settings(ABSENCIES_API_MODE=api_mode,
+                                       ALLOWED_HOSTS=['*']), \
+                        mock.patch.object(
+                            APIView, 'authentication_classes', classes
+                        ):
+                    for auth, header in credentials.items():
+                        clear_credential_caches()
+                        elapsed = self.measure(url, header, count)
+                        self.stdout.write(
+                            '{:<12} {:<8} {:>12.1f} {:>10.2f}'.format(
+                                mode, auth, count / elapsed,
+                                elapsed * 1000 / count
+                            )
+                        )
+
+            transaction.set_rollback(True)
+
+    def measure(self, url, header, count):
+        client = Client(HTTP_AUTHORIZATION=header)
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError('{} answered {}'.format(
+                url, response.status_code
+            ))
+
+        start = time.perf_counter()
+        for _ in range(count):
+            client.get(url)
+        return time.perf_counter() - start
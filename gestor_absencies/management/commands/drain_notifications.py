@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gestor_absencies.notifications import drain
+
+
+class Command(BaseCommand):
+    help = (
+        'Send the queued absence notifications. Runs until interrupted '
+        'unless --once is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--threads', type=int, default=None,
+            help='Mails sent at once, ABSENCIES_NOTIFICATION_THREADS by '
+                 'default.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=None,
+            help='Attempts before giving up on a notification, '
+                 'ABSENCIES_NOTIFICATION_MAX_ATTEMPTS by default.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when nothing is due.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once nothing is due.'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = drain(
+                batch_size=options['batch_size'],
+                threads=options['threads'],
+                max_attempts=options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write('Sent {}, failed {}.'.format(sent, failed))
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write('Done: sent {}, failed {}.'.format(
+            total_sent, total_failed
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gestor_absencies.datasets import BATCH_SIZE, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with a synthetic company for scale testing. The '
+        'same seed, years and first year always give the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1000)
+        parser.add_argument('--teams', type=int, default=50)
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--first-year', type=int, default=None,
+            help='First year with absences, years before now by default.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Workers generated and inserted at once.'
+        )
+        parser.add_argument(
+            '--prefix', default='worker',
+            help='Prefix of the generated usernames, which must be unused.'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        counts = DatasetGenerator(
+            workers=options['workers'],
+            teams=options['teams'],
+            years=options['years'],
+            seed=options['seed'],
+            first_year=options['first_year'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+        ).run()
+
+        self.stdout.write('Created {} in {:.1f}s.'.format(
+            ', '.join('{} {}'.format(n, name) for name, n in counts.items()),
+            time.perf_counter() - start
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gestor_absencies.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the sync tombstones older than '
+        'ABSENCIES_SYNC_TOMBSTONE_DAYS. Run it daily.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write('Pruned {} tombstones.'.format(deleted))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gestor_absencies.balances import rebuild_holiday_balances
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the holiday balance ledger of every worker from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_holiday_balances(batch_size=options['batch_size'])
+        self.stdout.write('Rebuilt {} holiday balances.'.format(count))
@@ -0,0 +1,77 @@
+from django.apps import apps as global_apps
+from django.contrib.auth.management import create_permissions
+from django.db import migrations
+
+
+DEFAULT_WORKER_GROUP = 'default_worker'
+
+DEFAULT_WORKER_PERMISSIONS = (
+    'view_worker',
+    'view_team',
+    'view_member',
+    'add_member',
+    'change_member',
+    'delete_member',
+)
+
+
+def default_permissions(apps):
+    create_permissions(
+        global_apps.get_app_config('gestor_absencies'),
+        apps=apps,
+        verbosity=0
+    )
+    Permission = apps.get_model('auth', 'Permission')
+    return Permission.objects.filter(
+        content_type__app_label='gestor_absencies',
+        codename__in=DEFAULT_WORKER_PERMISSIONS
+    )
+
+
+def move_permissions_to_group(apps, schema_editor):
+    Group = apps.get_model('auth', 'Group')
+    Worker = apps.get_model('gestor_absencies', 'Worker')
+
+    permissions = default_permissions(apps)
+    group, _ = Group.objects.get_or_create(name=DEFAULT_WORKER_GROUP)
+    group.permissions.add(*permissions)
+
+    Worker.groups.through.objects.bulk_create([
+        Worker.groups.through(worker_id=worker_id, group_id=group.pk)
+        for worker_id in Worker.objects.exclude(
+            groups=group
+        ).values_list('id', flat=True)
+    ])
+    Worker.user_permissions.through.objects.filter(
+        permission__in=permissions
+    ).delete()
+
+
+def move_permissions_to_workers(apps, schema_editor):
+    Group = apps.get_model('auth', 'Group')
+    Worker = apps.get_model('gestor_absencies', 'Worker')
+
+    permissions = list(default_permissions(apps))
+    Worker.user_permissions.through.objects.bulk_create([
+        Worker.user_permissions.through(
+            worker_id=worker_id,
+            permission_id=permission.pk
+        )
+        for worker_id in Worker.objects.values_list('id', flat=True)
+        for permission in permissions
+    ])
+    Group.objects.filter(name=DEFAULT_WORKER_GROUP).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0003_team_min_worker'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_permissions_to_group,
+            move_permissions_to_workers
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+def remove_duplicated_members(apps, schema_editor):
+    Member = apps.get_model('gestor_absencies', 'Member')
+
+    kept = {}
+    for member in Member.objects.order_by('id'):
+        key = (member.worker_id, member.team_id)
+        if key not in kept:
+            kept[key] = member
+            continue
+        first = kept[key]
+        if member.is_referent or member.is_representant:
+            first.is_referent = first.is_referent or member.is_referent
+            first.is_representant = (
+                first.is_representant or member.is_representant
+            )
+            first.save()
+        member.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0004_default_worker_group'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicated_members,
+            migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name='member',
+            unique_together={('worker', 'team')},
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['team', 'is_referent'], name='gestor_abse_team_id_53a707_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['team', 'is_representant'], name='gestor_abse_team_id_6d7588_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.apps import apps as global_apps
+from django.contrib.auth.management import create_permissions
+from django.db import migrations
+
+
+DEFAULT_WORKER_GROUP = 'default_worker'
+
+ABSENCE_PERMISSIONS = (
+    'view_somenergiaabsencetype',
+    'view_somenergiaabsence',
+    'add_somenergiaabsence',
+    'change_somenergiaabsence',
+    'delete_somenergiaabsence',
+)
+
+
+def absence_permissions(apps):
+    create_permissions(
+        global_apps.get_app_config('gestor_absencies'),
+        apps=apps,
+        verbosity=0
+    )
+    Permission = apps.get_model('auth', 'Permission')
+    return Permission.objects.filter(
+        content_type__app_label='gestor_absencies',
+        codename__in=ABSENCE_PERMISSIONS
+    )
+
+
+def add_absence_permissions(apps, schema_editor):
+    Group = apps.get_model('auth', 'Group')
+    group, _ = Group.objects.get_or_create(name=DEFAULT_WORKER_GROUP)
+    group.permissions.add(*absence_permissions(apps))
+
+
+def remove_absence_permissions(apps, schema_editor):
+    Group = apps.get_model('auth', 'Group')
+    for group in Group.objects.filter(name=DEFAULT_WORKER_GROUP):
+        group.permissions.remove(*absence_permissions(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0005_member_unique_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            add_absence_permissions,
+            remove_absence_permissions
+        ),
+    ]
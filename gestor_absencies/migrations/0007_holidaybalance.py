@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0006_default_worker_absence_permissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HolidayBalance',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='Year')),
+                ('spent_days', models.DecimalField(decimal_places=1, default=0, help_text='Days of absences spending holidays in this year', max_digits=6, verbose_name='Spent days')),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holiday_balances', to=settings.AUTH_USER_MODEL, verbose_name='Worker')),
+            ],
+            options={
+                'unique_together': {('worker', 'year')},
+            },
+        ),
+    ]
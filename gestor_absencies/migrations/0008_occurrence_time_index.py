@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swingtime', '0002_auto_20190313_0819'),
+        ('gestor_absencies', '0007_holidaybalance'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX swingtime_occurrence_event_time_idx '
+            'ON swingtime_occurrence (event_id, start_time, end_time)',
+            'DROP INDEX swingtime_occurrence_event_time_idx',
+        ),
+    ]
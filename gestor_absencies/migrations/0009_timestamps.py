@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0008_occurrence_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='create_date',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, help_text='Date when this object was saved', verbose_name='Create date'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Date when this object was modified', verbose_name='Modified date'),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='create_date',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, help_text='Date when this object was saved', verbose_name='Create date'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Date when this object was modified', verbose_name='Modified date'),
+        ),
+        migrations.AlterField(
+            model_name='base',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Date when this object was modified', verbose_name='Modified date'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0009_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Label of the model of the deleted object', max_length=100, verbose_name='Model')),
+                ('object_id', models.IntegerField(verbose_name='Object id')),
+                ('deleted_date', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Date when this object was deleted', verbose_name='Deleted date')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='somenergiaabsence',
+            name='create_date',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, help_text='Date when this object was saved', verbose_name='Create date'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='somenergiaabsence',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Date when this object was modified', verbose_name='Modified date'),
+        ),
+        migrations.AddField(
+            model_name='somenergiaabsencetype',
+            name='create_date',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, help_text='Date when this object was saved', verbose_name='Create date'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='somenergiaabsencetype',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Date when this object was modified', verbose_name='Modified date'),
+        ),
+    ]
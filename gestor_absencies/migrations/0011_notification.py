@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0010_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(help_text='What happened to the absence', max_length=20, verbose_name='Event')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Recipient')),
+                ('subject', models.CharField(max_length=200, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('dedup_key', models.CharField(help_text='Same key for the same message to the same recipient', max_length=64, unique=True, verbose_name='Deduplication key')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('superseded', 'Superseded')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.IntegerField(default=0, help_text='Times the notification has been tried to send', verbose_name='Attempts')),
+                ('next_attempt', models.DateTimeField(help_text='Date after which the notification may be sent', verbose_name='Next attempt')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last error')),
+                ('create_date', models.DateTimeField(auto_now_add=True, help_text='Date when this object was saved', verbose_name='Create date')),
+                ('sent_date', models.DateTimeField(null=True, verbose_name='Sent date')),
+                ('absence', models.ForeignKey(help_text='Absence this notification is about', null=True, on_delete=django.db.models.deletion.SET_NULL, to='gestor_absencies.SomEnergiaAbsence', verbose_name='Absence')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['status', 'next_attempt'], name='gestor_abse_status_4dd949_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0011_notification'),
+    ]
+
+    operations = [
+        # Absences requested before the approval workflow are approved
+        migrations.AddField(
+            model_name='somenergiaabsence',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], db_index=True, default='approved', help_text='Approval of the absence by a referent of the worker', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AlterField(
+            model_name='somenergiaabsence',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], db_index=True, default='pending', help_text='Approval of the absence by a referent of the worker', max_length=20, verbose_name='Status'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestor_absencies', '0012_somenergiaabsence_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holidaybalance',
+            name='modified_date',
+            field=models.DateTimeField(auto_now=True, help_text='Date when the spent days last changed', verbose_name='Modified date'),
+        ),
+    ]
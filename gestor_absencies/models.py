@@ -1,10 +1,13 @@
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, ContentType, Permission
 from django.db import models
+from gestor_absencies.common.default_permissions import (
+    grant_default_permissions
+)
 from swingtime.models import Event, EventType, Note, Occurrence
 
 
-class Base(models.Model):
+class TimeStamped(models.Model):
 
     create_date = models.DateTimeField(
         auto_now_add=True,
@@ -14,10 +17,18 @@ class Base(models.Model):
 
     modified_date = models.DateTimeField(
         auto_now=True,
+        db_index=True,
         verbose_name=_("Modified date"),
         help_text=_("Date when this object was modified")
     )
 
+    class Meta:
+        abstract = True
+
+
+class Base(TimeStamped):
+    pass
+
 
 class VacationPolicy(Base):
 
@@ -40,7 +51,7 @@ class VacationPolicy(Base):
     )
 
 
-class Worker(AbstractUser): # TODO: add BaseModel
+class Worker(AbstractUser, TimeStamped):
 
     category = models.CharField(
         max_length=50,
@@ -71,23 +82,12 @@ class Worker(AbstractUser): # TODO: add BaseModel
     )
 
     def save(self, *args, **kwargs):
-        if not self.pk:
-            pass
+        created = self._state.adding
 
         super(Worker, self).save(*args, **kwargs)
 
-        permission = Permission.objects.get(codename='view_worker')
-        self.user_permissions.add(permission)
-        permission = Permission.objects.get(codename='view_team')
-        self.user_permissions.add(permission)# TODO: refactor
-        permission = Permission.objects.get(codename='view_member')
-        self.user_permissions.add(permission)# TODO: refactor
-        permission = Permission.objects.get(codename='add_member')
-        self.user_permissions.add(permission)# TODO: refactor
-        permission = Permission.objects.get(codename='change_member')
-        self.user_permissions.add(permission)# TODO: refactor
-        permission = Permission.objects.get(codename='delete_member')
-        self.user_permissions.add(permission)# TODO: refactor
+        if created:
+            grant_default_permissions([self])
 
 
 class Team(Base):
@@ -113,7 +113,7 @@ class Team(Base):
         ordering = ('name',)
 
 
-class Member(models.Model): # TODO: BaseModel?
+class Member(TimeStamped):
 
     worker = models.ForeignKey(Worker, on_delete=models.CASCADE)
 
@@ -133,9 +133,14 @@ class Member(models.Model): # TODO: BaseModel?
 
     class Meta:
         ordering = ('is_representant', 'is_referent')
+        unique_together = ('worker', 'team')
+        indexes = [
+            models.Index(fields=['team', 'is_referent']),
+            models.Index(fields=['team', 'is_representant']),
+        ]
 
 
-class SomEnergiaAbsenceType(EventType):
+class SomEnergiaAbsenceType(EventType, TimeStamped):
 
     spend_days = models.BooleanField(   # Possible (-1 spend / 0 not / +1 add)
         default=True,
@@ -166,7 +171,17 @@ class SomEnergiaAbsenceType(EventType):
     )
 
 
-class SomEnergiaAbsence(Event):
+class SomEnergiaAbsence(Event, TimeStamped):
+
+    PENDING = 'pending'
+    APPROVED = 'approved'
+    REJECTED = 'rejected'
+
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (APPROVED, _("Approved")),
+        (REJECTED, _("Rejected")),
+    )
 
     absence_type = models.ForeignKey(
         SomEnergiaAbsenceType,
@@ -183,6 +198,15 @@ class SomEnergiaAbsence(Event):
         help_text=_("")
     )
 
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+        verbose_name=_("Status"),
+        help_text=_("Approval of the absence by a referent of the worker")
+    )
+
 
 class SomEnergiaOccurrence(Occurrence):
 
@@ -191,3 +215,152 @@ class SomEnergiaOccurrence(Occurrence):
         editable=False,
         on_delete=models.CASCADE
     )
+
+
+class HolidayBalance(models.Model):
+
+    worker = models.ForeignKey(
+        Worker,
+        on_delete=models.CASCADE,
+        related_name='holiday_balances',
+        verbose_name=_("Worker"),
+        help_text=_("")
+    )
+
+    year = models.IntegerField(
+        verbose_name=_("Year"),
+        help_text=_("")
+    )
+
+    spent_days = models.DecimalField(
+        default=0,
+        decimal_places=1,
+        max_digits=6,
+        verbose_name=_("Spent days"),
+        help_text=_("Days of absences spending holidays in this year")
+    )
+
+    modified_date = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Modified date"),
+        help_text=_("Date when the spent days last changed")
+    )
+
+    class Meta:
+        unique_together = ('worker', 'year')
+
+
+class Tombstone(models.Model):
+
+    model = models.CharField(
+        max_length=100,
+        verbose_name=_("Model"),
+        help_text=_("Label of the model of the deleted object")
+    )
+
+    object_id = models.IntegerField(
+        verbose_name=_("Object id"),
+        help_text=_("")
+    )
+
+    deleted_date = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name=_("Deleted date"),
+        help_text=_("Date when this object was deleted")
+    )
+
+
+class Notification(models.Model):
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    SUPERSEDED = 'superseded'
+
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (SENT, _("Sent")),
+        (FAILED, _("Failed")),
+        (SUPERSEDED, _("Superseded")),
+    )
+
+    absence = models.ForeignKey(
+        SomEnergiaAbsence,
+        null=True,
+        on_delete=models.SET_NULL,
+        verbose_name=_("Absence"),
+        help_text=_("Absence this notification is about")
+    )
+
+    event = models.CharField(
+        max_length=20,
+        verbose_name=_("Event"),
+        help_text=_("What happened to the absence")
+    )
+
+    recipient = models.EmailField(
+        verbose_name=_("Recipient"),
+        help_text=_("")
+    )
+
+    subject = models.CharField(
+        max_length=200,
+        verbose_name=_("Subject"),
+        help_text=_("")
+    )
+
+    body = models.TextField(
+        verbose_name=_("Body"),
+        help_text=_("")
+    )
+
+    dedup_key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name=_("Deduplication key"),
+        help_text=_("Same key for the same message to the same recipient")
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name=_("Status"),
+        help_text=_("")
+    )
+
+    attempts = models.IntegerField(
+        default=0,
+        verbose_name=_("Attempts"),
+        help_text=_("Times the notification has been tried to send")
+    )
+
+    next_attempt = models.DateTimeField(
+        verbose_name=_("Next attempt"),
+        help_text=_("Date after which the notification may be sent")
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name=_("Last error"),
+        help_text=_("")
+    )
+
+    create_date = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Create date"),
+        help_text=_("Date when this object was saved")
+    )
+
+    sent_date = models.DateTimeField(
+        null=True,
+        verbose_name=_("Sent date"),
+        help_text=_("")
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt']),
+        ]
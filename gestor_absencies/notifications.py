@@ -0,0 +1,195 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Member, Notification
+
+logger = logging.getLogger(__name__)
+
+EVENTS = {
+    'created': 'new absence',
+    'updated': 'absence changed',
+    'deleted': 'absence cancelled',
+}
+
+# Claimed notifications are retried after this long if the drain dies
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def get_recipients(worker):
+    """Emails of the referents and representants of the worker teams."""
+    if worker is None:
+        return []
+    return sorted(set(
+        Member.objects.filter(
+            Q(is_referent=True) | Q(is_representant=True),
+            team__in=Member.objects.filter(worker=worker).values('team'),
+        ).exclude(
+            worker=worker
+        ).exclude(
+            worker__email=''
+        ).values_list('worker__email', flat=True)
+    ))
+
+
+def render_message(absence, event, times):
+    worker = absence.worker
+    name = worker.get_full_name() or worker.username
+    subject = '[Absències] {}: {} ({})'.format(
+        name, absence.absence_type.label, EVENTS[event]
+    )
+    lines = ['{} - {}'.format(name, absence.absence_type.label), '']
+    lines.extend(
+        '{:%Y-%m-%d %H:%M} - {:%Y-%m-%d %H:%M}'.format(
+            timezone.localtime(start), timezone.localtime(end)
+        )
+        for start, end in times
+    )
+    if absence.description:
+        lines.extend(['', absence.description])
+    return subject[:200], '\n'.join(lines)
+
+
+def enqueue_notifications(absence, event, times):
+    """Queue the mails telling the worker referents about an absence.
+
+    Runs inside the transaction changing the absence, so the messages are
+    queued if and only if the change is committed. A change is queued once
+    per recipient, however many times this is called for it.
+    """
+    if not absence.absence_type.required_notify:
+        return []
+    recipients = get_recipients(absence.worker)
+    if not recipients:
+        return []
+
+    subject, body = render_message(absence, event, times)
+    now = timezone.now()
+    notifications = [
+        Notification(
+            absence_id=absence.pk,
+            event=event,
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            dedup_key=hashlib.sha256('|'.join((
+                str(absence.pk), event, recipient,
+                absence.modified_date.isoformat()
+            )).encode('utf-8')).hexdigest(),
+            next_attempt=now,
+        )
+        for recipient in recipients
+    ]
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+    return notifications
+
+
+def claim(batch_size):
+    """Mark a batch of due notifications as taken and return them.
+
+    Rows locked by another drain are skipped where the database supports
+    it. The claimed ones are pushed CLAIM_TIMEOUT away, so they are retried
+    if this process dies before sending them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update(skip_locked=True).filter(
+                status=Notification.PENDING,
+                next_attempt__lte=now,
+            ).order_by('pk')[:batch_size]
+        )
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(next_attempt=now + CLAIM_TIMEOUT)
+    return notifications
+
+
+def supersede(notifications):
+    """Keep only the latest message of a batch per absence and recipient.
+
+    Messages of deleted absences lost their absence and are all kept.
+    """
+    latest = {}
+    superseded = []
+    for notification in notifications:
+        key = (notification.absence_id, notification.recipient)
+        if notification.absence_id is None:
+            key = (notification.pk,)
+        if key in latest:
+            superseded.append(latest[key])
+        latest[key] = notification
+    if superseded:
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in superseded]
+        ).update(status=Notification.SUPERSEDED)
+    return list(latest.values())
+
+
+def send(notification):
+    try:
+        send_mail(
+            notification.subject,
+            notification.body,
+            settings.DEFAULT_FROM_EMAIL,
+            [notification.recipient],
+        )
+    except Exception as error:
+        logger.warning('Notification %s failed: %s', notification.pk, error)
+        return error
+    return None
+
+
+def retry_delay(attempts):
+    return timedelta(minutes=2 ** min(attempts, 10))
+
+
+def drain(batch_size=100, threads=None, max_attempts=None):
+    """Send one batch of due notifications. Returns the (sent, failed)
+    counts, failed ones being retried later with an exponential backoff
+    until ``max_attempts``."""
+    if threads is None:
+        threads = getattr(settings, 'ABSENCIES_NOTIFICATION_THREADS', 4)
+    if max_attempts is None:
+        max_attempts = getattr(
+            settings, 'ABSENCIES_NOTIFICATION_MAX_ATTEMPTS', 5
+        )
+
+    notifications = supersede(claim(batch_size))
+    if not notifications:
+        return 0, 0
+
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+        errors = list(executor.map(send, notifications))
+
+    now = timezone.now()
+    sent = [
+        notification.pk
+        for notification, error in zip(notifications, errors) if not error
+    ]
+    Notification.objects.filter(pk__in=sent).update(
+        status=Notification.SENT, sent_date=now
+    )
+    failed = 0
+    for notification, error in zip(notifications, errors):
+        if not error:
+            continue
+        failed += 1
+        attempts = notification.attempts + 1
+        Notification.objects.filter(pk=notification.pk).update(
+            attempts=attempts,
+            last_error=str(error),
+            status=(
+                Notification.FAILED if attempts >= max_attempts
+                else Notification.PENDING
+            ),
+            next_attempt=now + retry_delay(attempts),
+        )
+    return len(sent), failed
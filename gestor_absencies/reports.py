@@ -0,0 +1,129 @@
+import csv
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import (
+    Case,
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Value,
+    When
+)
+from django.utils import timezone
+
+from .balances import duration_days
+from .models import SomEnergiaAbsence, SomEnergiaOccurrence
+
+# group name: (column, expression) pairs it adds to every row
+REPORT_GROUPS = OrderedDict((
+    ('team', (
+        ('team', F('absence__worker__member__team')),
+        ('team_name', F('absence__worker__member__team__name')),
+    )),
+    ('worker', (
+        ('worker', F('absence__worker')),
+        ('worker_username', F('absence__worker__username')),
+    )),
+    ('type', (
+        ('type', F('absence__absence_type')),
+        ('type_label', F('absence__absence_type__label')),
+    )),
+    ('month', (
+        ('month', None),
+    )),
+))
+
+REPORT_TOTALS = ('occurrences', 'days', 'hours')
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+HOUR = timedelta(hours=1)
+
+
+def report_columns(group_by):
+    return [
+        column for group in group_by for column, _ in REPORT_GROUPS[group]
+    ] + list(REPORT_TOTALS)
+
+
+def month_expression(year):
+    """Local month of the occurrence start, compared against the month
+    boundaries instead of extracted from each row."""
+    boundaries = [
+        timezone.make_aware(datetime(year, month, 1))
+        for month in range(2, 13)
+    ]
+    return Case(
+        *[
+            When(start_time__lt=boundary, then=Value(month))
+            for month, boundary in enumerate(boundaries, 1)
+        ],
+        default=Value(12),
+        output_field=IntegerField()
+    )
+
+
+def absence_report(year, group_by):
+    """Approved absence time of a year, aggregated by the database.
+
+    Rows hold the ``group_by`` columns, the number of occurrences, the days
+    they count as in the holiday balance and their hours. Occurrences are
+    grouped by the month they start in, and grouping by team joins through
+    the members, so the absences of a worker in two teams count in both.
+    """
+    start = timezone.make_aware(datetime(year, 1, 1))
+    end = timezone.make_aware(datetime(year + 1, 1, 1))
+    columns = OrderedDict(
+        pair for group in group_by for pair in REPORT_GROUPS[group]
+    )
+    if 'month' in columns:
+        columns['month'] = month_expression(year)
+    duration = ExpressionWrapper(
+        F('end_time') - F('start_time'), output_field=DurationField()
+    )
+    rows = SomEnergiaOccurrence.objects.filter(
+        absence__status=SomEnergiaAbsence.APPROVED,
+        start_time__gte=start,
+        start_time__lt=end,
+    ).values(**columns, duration=duration).annotate(
+        occurrences=Count('pk')
+    ).order_by(*columns)
+
+    # occurrences mostly last a handful of distinct durations, so the
+    # database groups by them too and the days are summed up here
+    key = itemgetter(*columns)
+    for _, durations in groupby(rows.iterator(), key=lambda row: key(row)):
+        report = None
+        for row in durations:
+            if report is None:
+                report = OrderedDict(
+                    (column, row[column]) for column in columns
+                )
+                report.update(occurrences=0, days=Decimal(0), hours=0)
+            report['occurrences'] += row['occurrences']
+            report['days'] += duration_days(row['duration']) * \
+                row['occurrences']
+            report['hours'] += row['duration'] / HOUR * row['occurrences']
+        report['hours'] = round(report['hours'], 2)
+        yield report
+
+
+class Echo(object):
+    """File-like object handing back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(columns, rows):
+    """Stream report rows as CSV lines, the header first."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
@@ -0,0 +1,62 @@
+from gestor_absencies.common.versioned_cache import VersionedCache
+
+from .balances import occurrence_days
+from .models import SomEnergiaAbsenceType
+
+absence_type_cache = VersionedCache('absence_types')
+
+
+def get_absence_types():
+    """Return every absence type by id, cached for the whole process."""
+    return absence_type_cache.get(
+        'all',
+        lambda: {
+            absence_type.pk: absence_type
+            for absence_type in SomEnergiaAbsenceType.objects.all()
+        }
+    )
+
+
+def absence_duration(times):
+    """Days, in half-day steps, requested by the (start, end) pairs."""
+    return sum(occurrence_days(start, end) for start, end in times)
+
+
+def check_duration(absence_type, times):
+    """Return the errors of an absence against the bounds of its type.
+
+    A bound of zero or less means the type has no such bound.
+    """
+    duration = absence_duration(times)
+    errors = []
+    if 0 < absence_type.min_duration and duration < absence_type.min_duration:
+        errors.append(
+            '{} absences must last at least {} days.'.format(
+                absence_type.label, absence_type.min_duration
+            )
+        )
+    if 0 < absence_type.max_duration and duration > absence_type.max_duration:
+        errors.append(
+            '{} absences can not last more than {} days.'.format(
+                absence_type.label, absence_type.max_duration
+            )
+        )
+    return errors
+
+
+def validate_durations(absences):
+    """Check a batch of (absence type id, times) pairs in one pass.
+
+    The absence types come from the process cache, so validating a batch
+    costs no query per absence. Returns the errors of each absence, in the
+    same order.
+    """
+    absence_types = get_absence_types()
+    result = []
+    for absence_type_id, times in absences:
+        absence_type = absence_types.get(absence_type_id)
+        if absence_type is None:
+            result.append(['Unknown absence type {}.'.format(absence_type_id)])
+        else:
+            result.append(check_duration(absence_type, times))
+    return result
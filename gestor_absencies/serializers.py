@@ -7,6 +7,19 @@ from .models import (
     SomEnergiaAbsence,
     VacationPolicy
 )
+from .absences import (
+    FREQUENCIES,
+    MAX_OCCURRENCES,
+    RECURRENCE_FIELDS,
+    create_absence,
+    occurrence_times,
+    update_absence
+)
+from .approvals import MAX_APPROVALS
+from .balances import get_holiday_balance
+from .conflicts import find_conflicts
+from .rules import check_duration, get_absence_types
+from django.utils import timezone
 from rest_framework import serializers
 
 
@@ -29,6 +42,26 @@ class WorkerSerializer(serializers.HyperlinkedModelSerializer):
     #     return instance
 
 
+class HolidayBalanceSerializer(serializers.Serializer):
+    year = serializers.IntegerField()
+    allowance = serializers.IntegerField()
+    spent_days = serializers.DecimalField(max_digits=6, decimal_places=1)
+    remaining_days = serializers.DecimalField(max_digits=6, decimal_places=1)
+
+
+class WorkerDetailSerializer(WorkerSerializer):
+    holiday_balance = serializers.SerializerMethodField()
+
+    class Meta(WorkerSerializer.Meta):
+        fields = WorkerSerializer.Meta.fields + ['holiday_balance']
+
+    def get_holiday_balance(self, worker):
+        year = self.context.get('year') or timezone.now().year
+        return HolidayBalanceSerializer(
+            get_holiday_balance(worker, year)
+        ).data
+
+
 class CreateWorkerSerializer(serializers.HyperlinkedModelSerializer):
 
     class Meta:
@@ -64,10 +97,20 @@ class MemberSerializer(serializers.HyperlinkedModelSerializer):
     worker = serializers.PrimaryKeyRelatedField(queryset=Worker.objects, required=False) #TODO: id_worker
     team = serializers.PrimaryKeyRelatedField(queryset=Team.objects, required=False) #TODO: id:team
 
+    expandable_fields = {
+        'worker': WorkerSerializer,
+        'team': TeamSerializer,
+    }
+
     class Meta:
         model = Member
         fields = ['id', 'worker', 'team', 'is_referent', 'is_representant']
 
+    def __init__(self, *args, **kwargs):
+        super(MemberSerializer, self).__init__(*args, **kwargs)
+        for field in self.context.get('expand', ()):
+            self.fields[field] = self.expandable_fields[field](read_only=True)
+
     def create(self, validated_data): #TODO: Validation worker and team exist
         member = Member(
             worker=validated_data['worker'],
@@ -101,3 +144,119 @@ class SomEnergiaAbsenceTypeSerializer(serializers.HyperlinkedModelSerializer):
                     'max_duration',
                     'min_duration'
         ]
+
+
+class SomEnergiaOccurrenceSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = SomEnergiaOccurrence
+        fields = ['id', 'start_time', 'end_time']
+
+
+class CachedAbsenceTypeField(serializers.PrimaryKeyRelatedField):
+    """Absence type looked up in the process cache instead of the database."""
+
+    def to_internal_value(self, data):
+        try:
+            return get_absence_types()[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class SomEnergiaAbsenceSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(required=False, max_length=32)
+    description = serializers.CharField(
+        required=False, allow_blank=True, max_length=100
+    )
+    absence_type = CachedAbsenceTypeField(
+        queryset=SomEnergiaAbsenceType.objects
+    )
+    worker = serializers.PrimaryKeyRelatedField(
+        queryset=Worker.objects,
+        default=serializers.CurrentUserDefault()
+    )
+    start_time = serializers.DateTimeField(write_only=True)
+    end_time = serializers.DateTimeField(write_only=True)
+    freq = serializers.ChoiceField(
+        choices=list(FREQUENCIES), required=False, write_only=True
+    )
+    interval = serializers.IntegerField(
+        min_value=1, required=False, write_only=True
+    )
+    count = serializers.IntegerField(
+        min_value=1, max_value=MAX_OCCURRENCES,
+        required=False, write_only=True
+    )
+    until = serializers.DateTimeField(required=False, write_only=True)
+    occurrences = SomEnergiaOccurrenceSerializer(
+        source='somenergiaoccurrence_set', many=True, read_only=True
+    )
+    status = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = SomEnergiaAbsence
+        fields = [
+            'id', 'title', 'description', 'absence_type', 'worker',
+            'start_time', 'end_time', 'freq', 'interval', 'count', 'until',
+            'occurrences', 'status'
+        ]
+
+    def validate_worker(self, worker):
+        user = self.context['request'].user
+        if worker != user and not user.is_superuser:
+            raise serializers.ValidationError(
+                'You can only request absences for yourself.'
+            )
+        return worker
+
+    def validate(self, data):
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError({
+                'end_time': 'End time must be after start time.'
+            })
+        until = data.get('until')
+        if until and until < data['start_time']:
+            raise serializers.ValidationError({
+                'until': 'Until must be after start time.'
+            })
+        times = occurrence_times(
+            data['start_time'], data['end_time'],
+            **{key: data[key] for key in RECURRENCE_FIELDS if key in data}
+        )
+        if len(times) > MAX_OCCURRENCES:
+            raise serializers.ValidationError({
+                'until': 'An absence can not have more than {} '
+                         'occurrences.'.format(MAX_OCCURRENCES)
+            })
+        self.occurrence_times = times
+
+        errors = check_duration(data['absence_type'], times)
+        if errors:
+            raise serializers.ValidationError({'absence_type': errors})
+
+        if self.context.get('reject_conflicts', True) and find_conflicts(
+            data['worker'], times, exclude_absence=self.instance
+        ):
+            raise serializers.ValidationError(
+                'The absence overlaps with another absence of the worker.'
+            )
+        return data
+
+    def create(self, validated_data):
+        return create_absence(**validated_data)
+
+    def update(self, instance, validated_data):
+        return update_absence(instance, **validated_data)
+
+
+class AbsenceApprovalSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1,
+        max_length=MAX_APPROVALS
+    )
+    status = serializers.ChoiceField(choices=[
+        SomEnergiaAbsence.APPROVED, SomEnergiaAbsence.REJECTED
+    ])
+    force = serializers.BooleanField(required=False, default=False)
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+
+from gestor_absencies.balances import rebuild_holiday_balances
+from gestor_absencies.common.absencies_perm import permission_cache
+from gestor_absencies.common.authentication import (
+    clear_credential_caches
+)
+from gestor_absencies.common.default_permissions import (
+    clear_default_group_cache
+)
+from gestor_absencies.common.response_cache import (
+    invalidate_responses_on_commit
+)
+from gestor_absencies.models import (
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    Team,
+    VacationPolicy,
+    Worker
+)
+from gestor_absencies.rules import absence_type_cache
+from gestor_absencies.sync import SYNC_MODELS, record_deletion
+
+
+def invalidate_permissions(**kwargs):
+    permission_cache.invalidate()
+
+
+for through in (
+    Worker.groups.through,
+    Worker.user_permissions.through,
+    Group.permissions.through,
+):
+    m2m_changed.connect(invalidate_permissions, sender=through)
+
+for model in (Group, Permission):
+    post_save.connect(invalidate_permissions, sender=model)
+    post_delete.connect(invalidate_permissions, sender=model)
+
+post_delete.connect(invalidate_permissions, sender=Worker)
+
+
+@receiver(post_save, sender=Worker)
+def invalidate_new_worker_permissions(sender, created, **kwargs):
+    if created:
+        permission_cache.invalidate()
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def forget_verified_credentials(sender, **kwargs):
+    clear_credential_caches()
+
+
+@receiver(post_delete, sender=Group)
+def forget_default_group(sender, **kwargs):
+    clear_default_group_cache()
+
+
+@receiver(post_save, sender=SomEnergiaAbsenceType)
+@receiver(post_delete, sender=SomEnergiaAbsenceType)
+def invalidate_absence_types(sender, **kwargs):
+    absence_type_cache.invalidate()
+
+
+def absence_type_workers(absence_type):
+    return list(SomEnergiaAbsence.objects.filter(
+        absence_type=absence_type, worker__isnull=False
+    ).values_list('worker', flat=True).distinct())
+
+
+@receiver(pre_save, sender=SomEnergiaAbsenceType)
+def remember_spend_days(sender, instance, **kwargs):
+    instance._saved_spend_days = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('spend_days', flat=True).first()
+
+
+@receiver(post_save, sender=SomEnergiaAbsenceType)
+def rebuild_balances_on_spend_days(sender, instance, created, **kwargs):
+    saved = getattr(instance, '_saved_spend_days', None)
+    if not created and saved is not None and saved != instance.spend_days:
+        rebuild_holiday_balances(absence_type_workers(instance))
+
+
+@receiver(pre_delete, sender=SomEnergiaAbsenceType)
+def remember_absence_type_workers(sender, instance, **kwargs):
+    instance._absence_workers = absence_type_workers(instance)
+
+
+@receiver(post_delete, sender=SomEnergiaAbsenceType)
+def rebuild_balances_on_delete(sender, instance, **kwargs):
+    # the absences of the type are already gone with it
+    rebuild_holiday_balances(getattr(instance, '_absence_workers', []))
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=VacationPolicy)
+@receiver(post_delete, sender=VacationPolicy)
+@receiver(post_save, sender=SomEnergiaAbsenceType)
+@receiver(post_delete, sender=SomEnergiaAbsenceType)
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate_responses_on_commit(sender._meta.label_lower)
+
+
+def log_deletion(sender, instance, **kwargs):
+    record_deletion(instance)
+
+
+for model, _ in SYNC_MODELS.values():
+    post_delete.connect(log_deletion, sender=model)
@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Max, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from gestor_absencies.common.absencies_perm import has_cached_perms
+
+from .models import (
+    Member,
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    SomEnergiaOccurrence,
+    Team,
+    Tombstone,
+    VacationPolicy,
+    Worker
+)
+from .serializers import (
+    MemberSerializer,
+    SomEnergiaAbsenceSerializer,
+    SomEnergiaAbsenceTypeSerializer,
+    TeamSerializer,
+    VacationPolicySerializer,
+    WorkerSerializer
+)
+
+SYNC_MODELS = OrderedDict((
+    ('workers', (Worker, WorkerSerializer)),
+    ('teams', (Team, TeamSerializer)),
+    ('members', (Member, MemberSerializer)),
+    ('vacationpolicies', (VacationPolicy, VacationPolicySerializer)),
+    ('absencetypes', (SomEnergiaAbsenceType, SomEnergiaAbsenceTypeSerializer)),
+    ('absences', (SomEnergiaAbsence, SomEnergiaAbsenceSerializer)),
+))
+
+
+SNAPSHOT_SALT = 'gestor_absencies.sync.snapshot'
+
+
+def get_sync_overlap():
+    """How far before ``since`` changes are looked for again.
+
+    ``modified_date`` is set before the changing transaction commits, so a
+    row may become visible after a sync whose ``until`` is later than its
+    date. Looking back this long returns such rows again on the next sync.
+    """
+    return timedelta(
+        seconds=getattr(settings, 'ABSENCIES_SYNC_OVERLAP', 60)
+    )
+
+
+def get_tombstone_retention():
+    return timedelta(
+        days=getattr(settings, 'ABSENCIES_SYNC_TOMBSTONE_DAYS', 90)
+    )
+
+
+def get_snapshot_page_size():
+    return getattr(settings, 'ABSENCIES_SYNC_PAGE_SIZE', 1000)
+
+
+def get_sync_queryset(model):
+    queryset = model.objects.order_by('modified_date', 'pk')
+    if model is SomEnergiaAbsence:
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                'somenergiaoccurrence_set',
+                queryset=SomEnergiaOccurrence.objects.order_by('start_time')
+            )
+        )
+    return queryset
+
+
+def record_deletion(instance):
+    Tombstone.objects.create(
+        model=instance._meta.label_lower,
+        object_id=instance.pk
+    )
+
+
+def prune_tombstones(now=None):
+    """Delete the tombstones older than the retention, returning how many.
+
+    Clients whose last sync is older than that have to sync from scratch.
+    The latest tombstone of each model is kept, it dates the last deletion
+    for the conditional responses of the lists.
+    """
+    cutoff = (now or timezone.now()) - get_tombstone_retention()
+    deleted, _ = Tombstone.objects.filter(deleted_date__lt=cutoff).exclude(
+        pk__in=Tombstone.objects.values('model').annotate(
+            last=Max('pk')
+        ).values('last')
+    ).delete()
+    return deleted
+
+
+def is_expired(since, now=None):
+    """Whether the deletions after ``since`` may have been pruned."""
+    return since < (now or timezone.now()) - get_tombstone_retention()
+
+
+def synced_models(user):
+    """Return the SYNC_MODELS entries the user is allowed to view."""
+    return OrderedDict(
+        (name, (model, serializer_class))
+        for name, (model, serializer_class) in SYNC_MODELS.items()
+        if has_cached_perms(user, ['{}.view_{}'.format(
+            model._meta.app_label, model._meta.model_name
+        )])
+    )
+
+
+def get_changes(user, since, until, context=None):
+    """Return the objects modified and deleted in (since, until].
+
+    The range actually starts ``get_sync_overlap()`` before ``since``, so
+    the changes committed late are not missed. Clients get them twice and
+    must apply upserts and tombstones idempotently. Both ranges are served
+    by the ``modified_date`` and ``deleted_date`` indexes.
+    """
+    models = synced_models(user)
+    start = since - get_sync_overlap()
+
+    upserts = OrderedDict()
+    for name, (model, serializer_class) in models.items():
+        queryset = get_sync_queryset(model).filter(
+            modified_date__gt=start,
+            modified_date__lte=until
+        )
+        upserts[name] = serializer_class(
+            queryset, many=True, context=context or {}
+        ).data
+
+    tombstones = OrderedDict((name, []) for name in models)
+    names = {
+        model._meta.label_lower: name
+        for name, (model, _) in models.items()
+    }
+    deletions = Tombstone.objects.filter(
+        model__in=names,
+        deleted_date__gt=start,
+        deleted_date__lte=until
+    ).order_by('deleted_date', 'pk').values_list('model', 'object_id')
+    seen = set()
+    for label, object_id in deletions:
+        if (label, object_id) not in seen:
+            seen.add((label, object_id))
+            tombstones[names[label]].append(object_id)
+
+    return {'upserts': upserts, 'tombstones': tombstones}
+
+
+def make_snapshot_cursor(until, name, pk):
+    return signing.dumps(
+        {'until': until.isoformat(), 'model': name, 'after': pk},
+        salt=SNAPSHOT_SALT
+    )
+
+
+def read_snapshot_cursor(cursor):
+    """Return the (until, model name, last pk) of a snapshot cursor.
+
+    Raises ``signing.BadSignature`` for cursors not made by this server.
+    """
+    data = signing.loads(cursor, salt=SNAPSHOT_SALT)
+    until = parse_datetime(data['until'])
+    if until is None or data['model'] not in SYNC_MODELS:
+        raise signing.BadSignature('Malformed cursor.')
+    return until, data['model'], int(data['after'])
+
+
+def get_snapshot(user, until, cursor=None, page_size=None, context=None):
+    """Return a page of every object, the first sync of a client.
+
+    Objects are paged by model and primary key, at most ``page_size`` of
+    them per page. The next page is asked with the returned ``next``
+    cursor, which keeps the ``until`` of the first page. Objects changed or
+    deleted while paging are returned by the next ``get_changes`` since it.
+    """
+    page_size = page_size or get_snapshot_page_size()
+    models = synced_models(user)
+    after_name, after_pk = cursor or (None, 0)
+
+    upserts = OrderedDict((name, []) for name in models)
+    remaining = page_size
+    next_cursor = None
+    started = after_name is None
+    for name, (model, serializer_class) in models.items():
+        if not started:
+            if name != after_name:
+                continue
+            started = True
+        else:
+            after_pk = 0
+        if remaining <= 0:
+            next_cursor = make_snapshot_cursor(until, name, 0)
+            break
+        objects = list(
+            get_sync_queryset(model).filter(
+                pk__gt=after_pk
+            ).order_by('pk')[:remaining + 1]
+        )
+        if len(objects) > remaining:
+            objects = objects[:remaining]
+            next_cursor = make_snapshot_cursor(until, name, objects[-1].pk)
+        upserts[name] = serializer_class(
+            objects, many=True, context=context or {}
+        ).data
+        remaining -= len(objects)
+        if next_cursor:
+            break
+
+    return {'upserts': upserts, 'next': next_cursor}
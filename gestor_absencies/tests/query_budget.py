@@ -0,0 +1,123 @@
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from gestor_absencies.common.absencies_perm import permission_cache
+from gestor_absencies.common.authentication import clear_credential_caches
+from gestor_absencies.models import VacationPolicy
+from gestor_absencies.rules import absence_type_cache
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize(sql):
+    """Replace the literals of a statement, so repeated lookups compare
+    equal whatever row they fetch."""
+    return LITERALS.sub('?', sql)
+
+
+def reset_caches():
+    """Drop every cache, so each measure runs the cold path."""
+    cache.clear()
+    permission_cache.invalidate()
+    absence_type_cache.invalidate()
+    clear_credential_caches()
+
+
+def describe_queries(small, large):
+    """List the statements run more often by the larger dataset."""
+    extra = Counter(normalize(query['sql']) for query in large)
+    extra.subtract(normalize(query['sql']) for query in small)
+    lines = [
+        '  x{} {}'.format(count, sql)
+        for sql, count in extra.most_common() if count > 0
+    ]
+    return '\n'.join(lines)
+
+
+class QueryBudgetMixin(object):
+    """Check that endpoints run the same number of queries whatever the
+    amount of data.
+
+    Each check seeds the company with ``seed`` twice and requests the
+    endpoint after each seeding with cold caches. A different number of
+    queries fails with the statements the larger dataset ran in excess.
+    """
+
+    seed_sizes = (2, 5)
+
+    def setUp(self):
+        super(QueryBudgetMixin, self).setUp()
+        self.seeded = 0
+        self.test_team = create_team(name='Seed team')
+
+    def seed(self, n):
+        """Add ``n`` workers, each with a vacation policy and an absence
+        type of its own, a member of the seed team and of a team of its own,
+        and with an absence of as many occurrences as workers seeded."""
+        start = timezone.make_aware(datetime(2019, 4, 1, 9))
+        for _ in range(n):
+            self.seeded += 1
+            worker = create_worker(username='seed{}'.format(self.seeded))
+            worker.vacation_policy = VacationPolicy.objects.create(
+                name='Policy {}'.format(self.seeded), holidays=25
+            )
+            worker.save()
+            absence_type = create_absencetype(
+                abbr='t{}'.format(self.seeded),
+                label='Type {}'.format(self.seeded)
+            )
+            create_member(worker=worker, team=self.test_team)
+            create_member(
+                worker=worker,
+                team=create_team(name='Team {}'.format(self.seeded))
+            )
+            create_absence(
+                worker=worker,
+                absence_type=absence_type,
+                start_time=start,
+                end_time=start + timedelta(hours=8),
+                freq='weekly',
+                count=self.seeded,
+            )
+
+    def measure(self, url, params):
+        reset_caches()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                url() if callable(url) else url, params
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return queries.captured_queries
+
+    def assertConstantQueries(self, url, params=None):
+        """``url`` is a path or a callable returning one after seeding."""
+        measures = []
+        for size in self.seed_sizes:
+            self.seed(size)
+            measures.append(self.measure(url, params or {}))
+
+        small, large = measures
+        if len(small) != len(large):
+            self.fail(
+                '{} ran {} queries with {} workers and {} with {}. '
+                'Statements run in excess:\n{}'.format(
+                    url() if callable(url) else url,
+                    len(small), self.seed_sizes[0],
+                    len(large), sum(self.seed_sizes),
+                    describe_queries(small, large)
+                )
+            )
@@ -0,0 +1,503 @@
+import os
+from datetime import datetime
+from os.path import join
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from gestor_absencies.rules import validate_durations
+from gestor_absencies.models import (
+    HolidayBalance,
+    SomEnergiaAbsence,
+    SomEnergiaOccurrence,
+    VacationPolicy
+)
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class AbsenceTest(TestCase):
+    def setUp(self):
+        self.test_worker = create_worker()
+        self.test_other_worker = create_worker(username='other')
+        self.test_absencetype = create_absencetype()
+        self.base_url = reverse('absences')
+
+        self.test_absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+        )
+
+    def test__absence_list__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            self.base_url
+        )
+
+        occurrence = SomEnergiaOccurrence.objects.get(
+            absence=self.test_absence
+        )
+        expected = {'count': 1,
+                    'next': None,
+                    'previous': None,
+                    'results':
+                    [{'id': self.test_absence.pk,
+                      'title': 'Vacances',
+                      'description': '',
+                      'absence_type': self.test_absencetype.pk,
+                      'worker': self.test_worker.pk,
+                      'occurrences': [
+                          {'id': occurrence.pk,
+                           'start_time': '2019-04-01T09:00:00Z',
+                           'end_time': '2019-04-01T17:00:00Z',
+                           },
+                      ],
+                      'status': 'pending',
+                      }]
+                    }
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test__absence_list_filter__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            self.base_url, {'start': '2019-04-02', 'end': '2019-05-01'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+        response = self.client.get(
+            self.base_url,
+            {'worker': self.test_worker.pk, 'start': '2019-04-01'}
+        )
+
+        self.assertEqual(response.json()['count'], 1)
+
+    def test__absence_post_recurring__worker(self):
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-05-06T09:00:00Z',
+            'end_time': '2019-05-06T17:00:00Z',
+            'freq': 'weekly',
+            'count': 4,
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=body
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['worker'], self.test_worker.pk)
+        self.assertEqual(
+            [occurrence['start_time']
+             for occurrence in response.json()['occurrences']],
+            ['2019-05-06T09:00:00Z', '2019-05-13T09:00:00Z',
+             '2019-05-20T09:00:00Z', '2019-05-27T09:00:00Z']
+        )
+        absence = SomEnergiaAbsence.objects.get(pk=response.json()['id'])
+        self.assertEqual(absence.occurrence_set.count(), 4)
+
+    def test__absence_post_constant_queries(self):
+        queries = []
+        for count in (2, 40):
+            with CaptureQueriesContext(connection) as context:
+                create_absence(
+                    worker=self.test_worker,
+                    absence_type=self.test_absencetype,
+                    start_time=aware(2019, 6, 3, 9),
+                    end_time=aware(2019, 6, 3, 17),
+                    freq='daily',
+                    count=count,
+                )
+            queries.append(len(context))
+
+        self.assertEqual(queries[0], queries[1])
+
+    def test__absence_post_for_other__worker(self):
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'worker': self.test_other_worker.pk,
+            'start_time': '2019-05-06T09:00:00Z',
+            'end_time': '2019-05-06T17:00:00Z',
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=body
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__absence_post_wrong_dates__worker(self):
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-05-06T17:00:00Z',
+            'end_time': '2019-05-06T09:00:00Z',
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=body
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__absence_put__worker(self):
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-04-02T09:00:00Z',
+            'end_time': '2019-04-02T17:00:00Z',
+            'freq': 'daily',
+            'count': 2,
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.put(
+            join(self.base_url, str(self.test_absence.pk)),
+            data=body,
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [occurrence['start_time']
+             for occurrence in response.json()['occurrences']],
+            ['2019-04-02T09:00:00Z', '2019-04-03T09:00:00Z']
+        )
+        self.assertEqual(
+            SomEnergiaOccurrence.objects.filter(
+                absence=self.test_absence
+            ).count(),
+            2
+        )
+
+    def test__absence_post_overlapping__worker(self):
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-03-25T12:00:00Z',
+            'end_time': '2019-03-25T14:00:00Z',
+            'freq': 'weekly',
+            'count': 2,
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=body
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__absence_check__worker(self):
+        team = create_team()
+        create_member(worker=self.test_worker, team=team)
+        create_member(worker=self.test_other_worker, team=team)
+        other_absence = create_absence(
+            worker=self.test_other_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 8, 9),
+            end_time=aware(2019, 4, 8, 17),
+        )
+        body = {
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-03-25T09:00:00Z',
+            'end_time': '2019-03-25T17:00:00Z',
+            'freq': 'weekly',
+            'count': 4,
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            reverse('absences_check'), data=body
+        )
+
+        expected = {'conflicts': [
+                        {'absence': self.test_absence.pk,
+                         'start_time': '2019-04-01T09:00:00Z',
+                         'end_time': '2019-04-01T17:00:00Z',
+                         },
+                    ],
+                    'teammates': [
+                        {'worker': self.test_other_worker.pk,
+                         'absence': other_absence.pk,
+                         'start_time': '2019-04-08T09:00:00Z',
+                         'end_time': '2019-04-08T17:00:00Z',
+                         },
+                    ]
+                    }
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(SomEnergiaAbsence.objects.count(), 2)
+
+    def test__absence_delete__other_worker(self):
+        self.client.login(username='other', password='password')
+        response = self.client.delete(
+            join(self.base_url, str(self.test_absence.pk))
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test__absence_delete__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.delete(
+            join(self.base_url, str(self.test_absence.pk))
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(SomEnergiaOccurrence.objects.exists())
+
+    def tearDown(self):
+        self.test_absencetype.delete()
+        self.test_worker.delete()
+        self.test_other_worker.delete()
+
+
+class AbsenceRulesTest(TestCase):
+    def setUp(self):
+        self.test_worker = create_worker()
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_absencetype = create_absencetype(
+            abbr='pers', label='Personal', min_duration=1, max_duration=2
+        )
+        self.base_url = reverse('absences')
+
+    def absence_body(self, **body):
+        body.update({
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-05-06T09:00:00Z',
+            'end_time': '2019-05-06T17:00:00Z',
+        })
+        return body
+
+    def test__absence_post_too_long__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=self.absence_body(freq='daily', count=3)
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('absence_type', response.json())
+
+    def test__absence_post_too_short__worker(self):
+        body = self.absence_body()
+        body['end_time'] = '2019-05-06T11:00:00Z'
+        self.client.login(username='username', password='password')
+        response = self.client.post(self.base_url, data=body)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__absence_rules_invalidated_on_absencetype_put(self):
+        self.client.login(username='admin', password='password')
+        response = self.client.put(
+            join(reverse('absencetype'), str(self.test_absencetype.pk)),
+            data={'abbr': 'pers', 'min_duration': 1, 'max_duration': 3},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=self.absence_body(freq='daily', count=3)
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+    def test__validate_durations_batch(self):
+        one_day = [(aware(2019, 5, 6, 9), aware(2019, 5, 6, 17))]
+        validate_durations([])
+        with self.assertNumQueries(0):
+            errors = validate_durations([
+                (self.test_absencetype.pk, one_day),
+                (self.test_absencetype.pk, one_day * 3),
+                (0, one_day),
+            ])
+
+        self.assertEqual(errors[0], [])
+        self.assertEqual(len(errors[1]), 1)
+        self.assertEqual(len(errors[2]), 1)
+
+    def tearDown(self):
+        self.test_absencetype.delete()
+        self.test_worker.delete()
+        self.test_admin.delete()
+
+
+class HolidayBalanceTest(TestCase):
+    def setUp(self):
+        self.test_policy = VacationPolicy(
+            name='Default', description='', holidays=25
+        )
+        self.test_policy.save()
+        self.test_worker = create_worker()
+        self.test_worker.vacation_policy = self.test_policy
+        self.test_worker.save()
+        self.test_absencetype = create_absencetype()
+
+    def spent_days(self, year=2019):
+        return HolidayBalance.objects.get(
+            worker=self.test_worker, year=year
+        ).spent_days
+
+    def test__balance_on_create_and_delete(self):
+        absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 12, 30, 9),
+            end_time=aware(2019, 12, 30, 17),
+            freq='daily',
+            count=3,
+        )
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 13),
+        )
+        self.assertEqual(self.spent_days(), 2.5)
+        self.assertEqual(self.spent_days(2020), 1)
+
+        self.client.login(username='username', password='password')
+        response = self.client.delete(
+            join(reverse('absences'), str(absence.pk))
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.spent_days(), 0.5)
+        self.assertEqual(self.spent_days(2020), 0)
+
+    def test__balance_split_by_year(self):
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 12, 30, 0),
+            end_time=aware(2020, 1, 3, 0),
+        )
+
+        self.assertEqual(self.spent_days(), 2)
+        self.assertEqual(self.spent_days(2020), 2)
+
+    def test__balance_on_spend_days_change(self):
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 17),
+            freq='daily',
+            count=2,
+        )
+
+        self.test_absencetype.spend_days = False
+        self.test_absencetype.save()
+        self.assertEqual(self.spent_days(), 0)
+
+        self.test_absencetype.spend_days = True
+        self.test_absencetype.save()
+        self.assertEqual(self.spent_days(), 2)
+
+    def test__balance_on_absence_type_delete(self):
+        other_type = create_absencetype(abbr='vacB')
+        for absence_type in (self.test_absencetype, other_type):
+            create_absence(
+                worker=self.test_worker,
+                absence_type=absence_type,
+                start_time=aware(2019, 5, 6, 9),
+                end_time=aware(2019, 5, 6, 17),
+            )
+        self.assertEqual(self.spent_days(), 2)
+
+        other_type.delete()
+
+        self.assertEqual(self.spent_days(), 1)
+
+    def test__balance_not_spending_type(self):
+        create_absence(
+            worker=self.test_worker,
+            absence_type=create_absencetype(abbr='baiA', spend_days=False),
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 17),
+        )
+
+        self.assertFalse(HolidayBalance.objects.exists())
+
+    def test__balance_worker_detail(self):
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 17),
+            freq='daily',
+            count=2,
+        )
+
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            join(reverse('workers'), str(self.test_worker.pk)),
+            {'year': 2019}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['holiday_balance'], {
+            'year': 2019,
+            'allowance': 25,
+            'spent_days': '2.0',
+            'remaining_days': '23.0',
+        })
+
+    def test__worker_detail_modified_by_policy(self):
+        url = join(reverse('workers'), str(self.test_worker.pk))
+        self.client.login(username='username', password='password')
+        etag = self.client.get(url)['ETag']
+
+        self.test_policy.holidays = 30
+        self.test_policy.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['holiday_balance']['allowance'], 30)
+
+    def test__worker_detail_modified_by_balance(self):
+        url = join(reverse('workers'), str(self.test_worker.pk))
+        self.client.login(username='username', password='password')
+        etag = self.client.get(url, {'year': 2019})['ETag']
+
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 17),
+        )
+        response = self.client.get(
+            url, {'year': 2019}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['holiday_balance']['spent_days'], '1.0'
+        )
+
+    def test__rebuild_holiday_balances(self):
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 6, 9),
+            end_time=aware(2019, 5, 6, 17),
+            freq='daily',
+            count=4,
+        )
+        HolidayBalance.objects.update(spent_days=0)
+
+        call_command('rebuild_holiday_balances', stdout=open(os.devnull, 'w'))
+
+        self.assertEqual(self.spent_days(), 4)
+
+    def tearDown(self):
+        self.test_worker.delete()
+        self.test_policy.delete()
@@ -1,9 +1,17 @@
-from django.test import TestCase
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from gestor_absencies.common.default_permissions import (
+    clear_default_group_cache
+)
+from gestor_absencies.common.response_cache import (
+    get_response_cache_stats,
+    get_version
+)
 from gestor_absencies.models import SomEnergiaAbsenceType, Worker
 from django.urls import reverse
 
 
-class AdminTest(TestCase):
+class AbsenceTypeSetUp(object):
     def setUp(self):
         self.test_absencetype = SomEnergiaAbsenceType(
             abbr='vacn',
@@ -27,6 +35,8 @@ class AdminTest(TestCase):
         self.test_admin.is_superuser = True
         self.test_admin.save()
 
+
+class AdminTest(AbsenceTypeSetUp, TestCase):
     def test__absencetype_list__admin(self):
         self.client.login(username='Admin', password='superpassword')
         response = self.client.get(
@@ -117,3 +127,53 @@ class AdminTest(TestCase):
 
     def tearDown(self):
         self.test_absencetype.delete()
+
+
+class ResponseCacheTest(AbsenceTypeSetUp, TransactionTestCase):
+    """Responses are invalidated on commit, which TestCase never does."""
+
+    def setUp(self):
+        # the group cached by earlier tests was rolled back with them
+        clear_default_group_cache()
+        super(ResponseCacheTest, self).setUp()
+
+    def test__absencetype_list_cached__admin(self):
+        self.client.login(username='Admin', password='superpassword')
+        self.client.get(self.base_url)
+        hits = get_response_cache_stats().get(
+            ('gestor_absencies.somenergiaabsencetype', 'hits'), 0
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.base_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(
+            get_response_cache_stats()[
+                'gestor_absencies.somenergiaabsencetype', 'hits'
+            ],
+            hits + 1
+        )
+
+        self.client.post(self.base_url, data={
+            'abbr': 'baiA',
+            'label': 'baixa A',
+            'min_duration': 1,
+            'max_duration': 3,
+        })
+        response = self.client.get(self.base_url)
+
+        self.assertEqual(response.json()['count'], 2)
+
+    def test__absencetype_invalidated_on_commit(self):
+        namespace = 'gestor_absencies.somenergiaabsencetype'
+        version = get_version(namespace)
+
+        with transaction.atomic():
+            self.test_absencetype.label = 'Vacances pagades'
+            self.test_absencetype.save()
+            uncommitted = get_version(namespace)
+            self.assertNotEqual(uncommitted, version)
+
+        self.assertNotEqual(get_version(namespace), uncommitted)
@@ -0,0 +1,302 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from gestor_absencies.absences import update_absence
+from gestor_absencies.models import HolidayBalance, SomEnergiaAbsence
+from gestor_absencies.rules import get_absence_types
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class AbsenceApprovalTest(TestCase):
+    def setUp(self):
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_referent = create_worker(username='referent')
+        self.test_worker = create_worker(username='username')
+        self.test_other_worker = create_worker(username='other')
+        self.test_team = create_team()
+        member = create_member(worker=self.test_referent, team=self.test_team)
+        member.is_referent = True
+        member.save()
+        create_member(worker=self.test_worker, team=self.test_team)
+        create_member(worker=self.test_other_worker, team=self.test_team)
+        self.test_absencetype = create_absencetype()
+        self.url = reverse('absences_approve')
+
+    def create_absences(self, worker, days, month=4):
+        return [
+            create_absence(
+                worker=worker,
+                absence_type=self.test_absencetype,
+                start_time=aware(2019, month, day, 9),
+                end_time=aware(2019, month, day, 17),
+            )
+            for day in days
+        ]
+
+    def post(self, absences, status='approved', username='referent',
+             **kwargs):
+        self.client.login(username=username, password='password')
+        data = dict(
+            ids=[absence.pk for absence in absences], status=status, **kwargs
+        )
+        return self.client.post(
+            self.url, json.dumps(data), content_type='application/json'
+        )
+
+    def statuses(self, absences):
+        return [
+            SomEnergiaAbsence.objects.get(pk=absence.pk).status
+            for absence in absences
+        ]
+
+    def spent_days(self, worker):
+        return HolidayBalance.objects.get(worker=worker, year=2019).spent_days
+
+    def test__new_absences_are_pending(self):
+        absence, = self.create_absences(self.test_worker, [1])
+
+        self.assertEqual(absence.status, 'pending')
+
+    def test__approve__referent(self):
+        absences = self.create_absences(self.test_worker, [1, 2]) + \
+            self.create_absences(self.test_other_worker, [3])
+
+        response = self.post(absences)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'status': 'approved',
+            'ids': [absence.pk for absence in absences],
+        })
+        self.assertEqual(self.statuses(absences), ['approved'] * 3)
+
+    def test__approve_queries_do_not_grow(self):
+        few = self.create_absences(self.test_worker, [1, 2])
+        many = self.create_absences(self.test_worker, range(3, 13)) + \
+            self.create_absences(self.test_other_worker, range(3, 13))
+        self.client.login(username='referent', password='password')
+        # absence types are read once per process
+        get_absence_types()
+
+        queries = []
+        for absences in (few, many):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, json.dumps({
+                    'ids': [absence.pk for absence in absences],
+                    'status': 'approved',
+                }), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            queries.append(len(context))
+
+        self.assertEqual(queries[0], queries[1])
+
+    def test__approve__not_referent(self):
+        absences = self.create_absences(self.test_worker, [1])
+
+        response = self.post(absences, username='other')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.statuses(absences), ['pending'])
+
+    def test__approve__other_team(self):
+        outsider = create_worker(username='outsider')
+        create_member(worker=outsider, team=create_team(name='Other'))
+        absences = self.create_absences(self.test_worker, [1]) + \
+            self.create_absences(outsider, [1])
+
+        response = self.post(absences)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.statuses(absences), ['pending', 'pending'])
+
+    def test__approve__own_absence(self):
+        absences = self.create_absences(self.test_referent, [1])
+
+        response = self.post(absences)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.statuses(absences), ['pending'])
+
+    def test__approve__unknown_absence(self):
+        absence, = self.create_absences(self.test_worker, [1])
+        self.client.login(username='referent', password='password')
+
+        response = self.client.post(self.url, json.dumps({
+            'ids': [absence.pk, absence.pk + 100], 'status': 'approved'
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses([absence]), ['pending'])
+
+    def test__approve__wrong_status(self):
+        absences = self.create_absences(self.test_worker, [1])
+
+        response = self.post(absences, status='pending')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__approve_longer_than_type(self):
+        self.test_absencetype.max_duration = 2
+        self.test_absencetype.save()
+        absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+            freq='daily',
+            count=3,
+        )
+
+        response = self.post([absence], force=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'ids': [
+            'Absence {}: Vacances absences can not last more than 2.0 '
+            'days.'.format(absence.pk)
+        ]})
+        self.assertEqual(self.statuses([absence]), ['pending'])
+
+        response = self.post([absence], status='rejected')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test__approve_below_min_worker(self):
+        self.test_team.min_worker = 2
+        self.test_team.save()
+        create_absence(
+            worker=self.test_other_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 2, 9),
+            end_time=aware(2019, 4, 2, 17),
+            status='approved',
+        )
+        absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+            freq='daily',
+            count=3,
+        )
+
+        response = self.post([absence])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'coverage': [
+            {'team': self.test_team.pk, 'date': '2019-04-02', 'present': 1,
+             'min_worker': 2},
+        ]})
+        self.assertEqual(self.statuses([absence]), ['pending'])
+
+        response = self.post([absence], force=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses([absence]), ['approved'])
+
+    def test__approve_already_below_min_worker(self):
+        self.test_team.min_worker = 2
+        self.test_team.save()
+        create_absence(
+            worker=self.test_other_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 5, 9),
+            end_time=aware(2019, 4, 5, 17),
+            status='approved',
+        )
+        create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 5, 9),
+            end_time=aware(2019, 4, 6, 17),
+            status='approved',
+        )
+        # the worker is away that day already, nothing changes
+        absence, = self.create_absences(self.test_worker, [5])
+
+        response = self.post([absence])
+
+        self.assertEqual(response.status_code, 200)
+
+        absence, = self.create_absences(self.test_referent, [5])
+
+        response = self.post([absence], username='admin')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'coverage': [
+            {'team': self.test_team.pk, 'date': '2019-04-05', 'present': 0,
+             'min_worker': 2},
+        ]})
+        self.assertEqual(self.statuses([absence]), ['pending'])
+
+    def test__reject_returns_days(self):
+        absences = self.create_absences(self.test_worker, [1, 2])
+        self.assertEqual(self.spent_days(self.test_worker), Decimal(2))
+
+        response = self.post(absences[:1], status='rejected')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(absences), ['rejected', 'pending'])
+        self.assertEqual(self.spent_days(self.test_worker), Decimal(1))
+
+        self.post(absences[:1], status='rejected')
+        self.assertEqual(self.spent_days(self.test_worker), Decimal(1))
+
+        self.post(absences, status='approved')
+        self.assertEqual(self.spent_days(self.test_worker), Decimal(2))
+
+    def test__rejected_absence_can_be_requested_again(self):
+        absences = self.create_absences(self.test_worker, [1])
+        self.post(absences, status='rejected')
+
+        self.client.login(username='username', password='password')
+        response = self.client.post(reverse('absences'), {
+            'worker': self.test_worker.pk,
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-04-01T09:00:00Z',
+            'end_time': '2019-04-01T17:00:00Z',
+        })
+
+        self.assertEqual(response.status_code, 201)
+
+    def test__changed_absence_is_pending_again(self):
+        absence, = self.create_absences(self.test_worker, [1])
+        self.post([absence])
+
+        absence.refresh_from_db()
+        update_absence(
+            absence,
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 2, 9),
+            end_time=aware(2019, 4, 2, 17),
+        )
+
+        self.assertEqual(self.statuses([absence]), ['pending'])
+
+    def test__absence_list_filter_status(self):
+        absences = self.create_absences(self.test_worker, [1, 2])
+        self.post(absences[:1])
+
+        self.client.login(username='username', password='password')
+        response = self.client.get(reverse('absences'), {'status': 'pending'})
+
+        self.assertEqual(
+            [absence['id'] for absence in response.json()['results']],
+            [absences[1].pk]
+        )
@@ -0,0 +1,188 @@
+import base64
+import time
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from gestor_absencies.common.authentication import (
+    TokenCache,
+    clear_credential_caches,
+    token_cache
+)
+from gestor_absencies.tests.test_helper import create_team, create_worker
+
+
+class JWTAuthenticationTest(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.test_worker = create_worker()
+        self.test_team = create_team()
+        self.teams_url = reverse('teams')
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def obtain_token(self):
+        response = self.client.post(
+            reverse('token_auth'),
+            {'username': 'username', 'password': 'password'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['token']
+
+    def get_teams(self, token):
+        return self.client.get(
+            self.teams_url, HTTP_AUTHORIZATION='JWT ' + token
+        )
+
+    def test__token_auth(self):
+        token = self.obtain_token()
+
+        response = self.get_teams(token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test__cached_token_skips_user_lookup(self):
+        token = self.obtain_token()
+        self.get_teams(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_teams(token)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(
+            'gestor_absencies_worker' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test__deactivated_worker_is_rejected(self):
+        token = self.obtain_token()
+        self.get_teams(token)
+
+        self.test_worker.is_active = False
+        self.test_worker.save()
+        response = self.get_teams(token)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__invalid_token(self):
+        response = self.get_teams('not.a.token')
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__token_refresh(self):
+        token = self.obtain_token()
+
+        response = self.client.post(
+            reverse('token_refresh'), {'token': token}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_teams(response.json()['token']).status_code, 200
+        )
+
+
+def basic_auth(username, password):
+    return 'Basic ' + base64.b64encode(
+        '{}:{}'.format(username, password).encode('utf-8')
+    ).decode('ascii')
+
+
+class BasicAuthenticationTest(TestCase):
+    def setUp(self):
+        clear_credential_caches()
+        self.test_worker = create_worker()
+        self.teams_url = reverse('teams')
+
+    def tearDown(self):
+        clear_credential_caches()
+
+    def test__cached_credentials_skip_user_lookup(self):
+        auth = basic_auth('username', 'password')
+        self.client.get(self.teams_url, HTTP_AUTHORIZATION=auth)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.teams_url, HTTP_AUTHORIZATION=auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(
+            'gestor_absencies_worker' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test__wrong_password(self):
+        self.client.get(
+            self.teams_url,
+            HTTP_AUTHORIZATION=basic_auth('username', 'password')
+        )
+
+        response = self.client.get(
+            self.teams_url, HTTP_AUTHORIZATION=basic_auth('username', 'wrong')
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__changed_password(self):
+        auth = basic_auth('username', 'password')
+        self.client.get(self.teams_url, HTTP_AUTHORIZATION=auth)
+
+        self.test_worker.set_password('changed')
+        self.test_worker.save()
+        response = self.client.get(self.teams_url, HTTP_AUTHORIZATION=auth)
+
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(ABSENCIES_API_MODE=True)
+class ApiModeTest(TestCase):
+    def setUp(self):
+        clear_credential_caches()
+        self.test_worker = create_worker()
+        self.teams_url = reverse('teams')
+
+    def test__api_skips_session(self):
+        self.client.login(username='username', password='password')
+
+        response = self.client.get(self.teams_url)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__api_with_credentials(self):
+        response = self.client.get(
+            self.teams_url,
+            HTTP_AUTHORIZATION=basic_auth('username', 'password')
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Frame-Options'))
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test__other_paths_keep_middleware(self):
+        response = self.client.get(reverse('admin:login'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('X-Frame-Options'))
+
+
+class TokenCacheTest(TestCase):
+    def test__entries_expire(self):
+        cache = TokenCache('UNSET_TTL', 'UNSET_SIZE')
+
+        cache.set('token', 'value', expires=time.time() - 1)
+
+        self.assertIsNone(cache.get('token'))
+
+    def test__least_recently_used_entries_are_dropped(self):
+        cache = TokenCache('UNSET_TTL', 'UNSET_SIZE', default_size=2)
+
+        cache.set('first', 1)
+        cache.set('second', 2)
+        cache.get('first')
+        cache.set('third', 3)
+
+        self.assertEqual(cache.get('first'), 1)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('third'), 3)
@@ -0,0 +1,24 @@
+from django.test import TestCase
+from gestor_absencies.common.bulk import bulk_create_inherited
+from gestor_absencies.models import Team
+from gestor_absencies.tests.test_helper import create_team
+
+
+class BulkCreateTest(TestCase):
+    def test__bulk_create_inherited(self):
+        create_team(name='IT')
+
+        teams = bulk_create_inherited(
+            Team, [Team(name='ET'), Team(name='OV')]
+        )
+
+        self.assertEqual(
+            list(Team.objects.filter(
+                pk__in=[team.pk for team in teams]
+            ).order_by('pk').values_list('name', flat=True)),
+            ['ET', 'OV']
+        )
+        self.assertEqual(Team.objects.count(), 3)
+
+    def test__bulk_create_inherited_nothing(self):
+        self.assertEqual(bulk_create_inherited(Team, []), [])
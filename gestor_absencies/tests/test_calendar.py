@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from gestor_absencies.calendars import fold
+from gestor_absencies.models import (
+    Member,
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    SomEnergiaOccurrence,
+    Worker
+)
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class CalendarTest(TestCase):
+    def setUp(self):
+        self.test_worker = create_worker()
+        self.test_worker.first_name = 'Maria'
+        self.test_worker.last_name = 'Garcia'
+        self.test_worker.save()
+        self.test_other_worker = create_worker(username='other')
+        self.test_team = create_team()
+        create_member(worker=self.test_worker, team=self.test_team)
+        self.test_absencetype = create_absencetype()
+        self.test_absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+            freq='daily',
+            count=2,
+        )
+        create_absence(
+            worker=self.test_other_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 5, 1, 9),
+            end_time=aware(2019, 5, 1, 17),
+        )
+        self.worker_url = reverse(
+            'workers_calendar', kwargs={'pk': self.test_worker.pk}
+        )
+        self.team_url = reverse(
+            'teams_calendar', kwargs={'pk': self.test_team.pk}
+        )
+
+    def get_content(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test__worker_calendar(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(self.worker_url)
+
+        occurrences = SomEnergiaOccurrence.objects.filter(
+            absence=self.test_absence
+        ).order_by('start_time')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response['Content-Type'], 'text/calendar; charset=utf-8'
+        )
+        content = self.get_content(response)
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('X-WR-CALNAME:Maria Garcia\r\n', content)
+        self.assertEqual(content.count('BEGIN:VEVENT'), 2)
+        self.assertIn(
+            'UID:occurrence-{}@testserver\r\n'.format(occurrences[0].pk),
+            content
+        )
+        self.assertIn('DTSTART:20190401T090000Z\r\n', content)
+        self.assertIn('DTEND:20190402T170000Z\r\n', content)
+        self.assertIn('SUMMARY:Maria Garcia: Vacances\r\n', content)
+        self.assertIn('CATEGORIES:vacn\r\n', content)
+
+    def test__team_calendar(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(self.team_url)
+
+        self.assertEqual(response.status_code, 200)
+        content = self.get_content(response)
+        self.assertIn('X-WR-CALNAME:IT\r\n', content)
+        self.assertEqual(content.count('BEGIN:VEVENT'), 2)
+        self.assertNotIn('20190501', content)
+
+    def test__calendar_not_modified(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(self.team_url)
+
+        response = self.client.get(
+            self.team_url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test__calendar_modified_by_new_member(self):
+        self.client.login(username='username', password='password')
+        etag = self.client.get(self.team_url)['ETag']
+
+        create_member(worker=self.test_other_worker, team=self.test_team)
+        response = self.client.get(self.team_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_content(response).count('BEGIN:VEVENT'), 3
+        )
+
+    def test__calendar_accept_text_calendar(self):
+        self.client.login(username='username', password='password')
+        for url in (self.worker_url, self.team_url):
+            response = self.client.get(url, HTTP_ACCEPT='text/calendar')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(
+                self.get_content(response).startswith('BEGIN:VCALENDAR')
+            )
+
+    def age_feed(self):
+        past = timezone.now() - timedelta(minutes=5)
+        for model in (Member, SomEnergiaAbsence, SomEnergiaAbsenceType,
+                      Worker):
+            model.objects.update(modified_date=past)
+        self.client.login(username='username', password='password')
+        return self.client.get(self.team_url)['Last-Modified']
+
+    def test__calendar_modified_by_deleted_absence(self):
+        last_modified = self.age_feed()
+
+        self.test_absence.delete()
+        response = self.client.get(
+            self.team_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', self.get_content(response))
+
+    def test__calendar_modified_by_deleted_member(self):
+        last_modified = self.age_feed()
+
+        Member.objects.filter(worker=self.test_worker).delete()
+        response = self.client.get(
+            self.team_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', self.get_content(response))
+
+    def test__calendar__anonymous(self):
+        response = self.client.get(self.team_url)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__fold_long_lines(self):
+        line = 'SUMMARY:' + 'à' * 80
+
+        folded = fold(line).split('\r\n')
+
+        self.assertEqual(folded[-1], '')
+        self.assertTrue(all(len(part.encode('utf-8')) <= 75
+                            for part in folded))
+        self.assertEqual(
+            ''.join(part[1:] if i else part for i, part in enumerate(folded)),
+            line
+        )
@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+from gestor_absencies.datasets import DatasetGenerator
+from gestor_absencies.models import (
+    HolidayBalance,
+    Member,
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    SomEnergiaOccurrence,
+    Team,
+    VacationPolicy,
+    Worker
+)
+
+
+class DatasetGeneratorTest(TestCase):
+    def generate(self, **kwargs):
+        options = dict(workers=12, teams=3, years=2, seed=1, first_year=2018,
+                       batch_size=5)
+        options.update(kwargs)
+        return DatasetGenerator(**options).run()
+
+    def test__counts(self):
+        counts = self.generate()
+
+        self.assertEqual(counts['workers'], 12)
+        self.assertEqual(Worker.objects.count(), 12)
+        self.assertEqual(Team.objects.count(), 3)
+        self.assertEqual(Member.objects.count(), counts['members'])
+        self.assertEqual(
+            SomEnergiaAbsence.objects.count(), counts['absences']
+        )
+        self.assertEqual(
+            SomEnergiaOccurrence.objects.count(), counts['occurrences']
+        )
+
+    def test__occurrences_belong_to_their_absence(self):
+        self.generate()
+
+        self.assertFalse(SomEnergiaOccurrence.objects.exclude(
+            event_id=F('absence_id')
+        ).exists())
+        self.assertFalse(SomEnergiaAbsence.objects.filter(
+            somenergiaoccurrence__isnull=True
+        ).exists())
+
+    def test__absences_follow_their_type_bounds(self):
+        SomEnergiaAbsenceType.objects.create(
+            abbr='vacn', label='Vacances', max_duration=3
+        )
+        self.generate()
+
+        durations = SomEnergiaAbsence.objects.filter(
+            absence_type__abbr='vacn'
+        ).annotate(days=Count('somenergiaoccurrence')).values_list(
+            'days', flat=True
+        )
+        self.assertTrue(durations)
+        self.assertLessEqual(max(durations), 3)
+
+    def test__absences_do_not_overlap(self):
+        self.generate()
+
+        occurrences = SomEnergiaOccurrence.objects.order_by(
+            'absence__worker', 'start_time'
+        ).values_list('absence__worker', 'start_time', 'end_time')
+        last_end = {}
+        for worker_id, start_time, end_time in occurrences:
+            if worker_id in last_end:
+                self.assertGreaterEqual(start_time, last_end[worker_id])
+            last_end[worker_id] = end_time
+
+    def test__workers_can_login(self):
+        self.generate()
+
+        self.assertTrue(self.client.login(
+            username='worker000001', password='password'
+        ))
+
+    def test__deterministic(self):
+        first = self.generate()
+        occurrences = list(SomEnergiaOccurrence.objects.order_by(
+            'start_time', 'absence__worker__username'
+        ).values_list('absence__worker__username', 'start_time', 'end_time'))
+        Worker.objects.all().delete()
+        Team.objects.all().delete()
+
+        second = self.generate()
+
+        self.assertEqual(first, second)
+        self.assertEqual(occurrences, list(
+            SomEnergiaOccurrence.objects.order_by(
+                'start_time', 'absence__worker__username'
+            ).values_list(
+                'absence__worker__username', 'start_time', 'end_time'
+            )
+        ))
+
+    def test__balances_match_rebuild(self):
+        self.generate()
+        generated = set(HolidayBalance.objects.values_list(
+            'worker', 'year', 'spent_days'
+        ))
+
+        call_command('rebuild_holiday_balances', stdout=StringIO())
+
+        self.assertTrue(generated)
+        self.assertEqual(generated, set(HolidayBalance.objects.values_list(
+            'worker', 'year', 'spent_days'
+        )))
+
+    def test__policies_and_referents(self):
+        self.generate()
+
+        self.assertEqual(VacationPolicy.objects.count(), 3)
+        self.assertFalse(
+            Worker.objects.filter(vacation_policy__isnull=True).exists()
+        )
+        for team in Team.objects.filter(member__isnull=False).distinct():
+            self.assertEqual(
+                Member.objects.filter(team=team, is_referent=True).count(), 1
+            )
+
+
+class GenerateDatasetTest(TestCase):
+    def test__generate_dataset(self):
+        out = StringIO()
+
+        call_command(
+            'generate_dataset', workers=4, teams=2, years=1, seed=3,
+            stdout=out
+        )
+
+        self.assertEqual(Worker.objects.count(), 4)
+        self.assertIn('4 workers, 2 teams', out.getvalue())
@@ -1,4 +1,11 @@
-from gestor_absencies.models import Worker, Team, Member
+from gestor_absencies.absences import create_absence as new_absence
+from gestor_absencies.approvals import set_status
+from gestor_absencies.models import (
+    Member,
+    SomEnergiaAbsenceType,
+    Team,
+    Worker
+)
 
 
 worker_attributes = {
@@ -39,3 +46,30 @@ def create_member(worker, team):
     )
     member.save()
     return member
+
+
+def create_absencetype(abbr='vacn', label='Vacances', spend_days=True,
+                       min_duration=0.5, max_duration=-1):
+    absencetype = SomEnergiaAbsenceType(
+        abbr=abbr,
+        label=label,
+        spend_days=spend_days,
+        min_duration=min_duration,
+        max_duration=max_duration,
+    )
+    absencetype.save()
+    return absencetype
+
+
+def create_absence(worker, absence_type, start_time, end_time, status=None,
+                   **recurrence):
+    absence = new_absence(
+        worker=worker,
+        absence_type=absence_type,
+        start_time=start_time,
+        end_time=end_time,
+        **recurrence
+    )
+    if status:
+        set_status([absence], status)
+    return absence
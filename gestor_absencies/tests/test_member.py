@@ -1,6 +1,8 @@
 from os.path import join
 from django.urls import reverse
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from gestor_absencies.tests.test_helper import (
     create_member,
     create_team,
@@ -78,10 +80,43 @@ class MemberTest(TestCase):
 
         self.member_otherrelation.delete()
 
+    def test__list_filter_members_combined(self):
+        other_team = create_team(name='ET')
+        other_worker = create_worker(username='other')
+        create_member(worker=self.test_worker, team=other_team)
+        referent = create_member(worker=other_worker, team=other_team)
+        referent.is_referent = True
+        referent.save()
+
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            self.base_url,
+            {'team': '{},{}'.format(self.id_team, other_team.pk),
+             'worker': other_worker.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [member['id'] for member in response.json()['results']],
+            [referent.pk]
+        )
+
+        response = self.client.get(
+            self.base_url,
+            {'team': [self.id_team, other_team.pk], 'is_referent': 'true'}
+        )
+        self.assertEqual(
+            [member['id'] for member in response.json()['results']],
+            [referent.pk]
+        )
+
+        response = self.client.get(self.base_url, {'team': 'IT'})
+        self.assertEqual(response.status_code, 400)
+
     def test__add_member(self):
+        other_team = create_team(name='ET')
         body = {
             'worker': self.id_worker,
-            'team': self.id_team
+            'team': other_team.pk
         }
         self.client.login(username='username', password='password')
         response = self.client.post(
@@ -90,10 +125,22 @@ class MemberTest(TestCase):
 
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json()['worker'], self.id_worker)
-        self.assertEqual(response.json()['team'], self.id_team)
+        self.assertEqual(response.json()['team'], other_team.pk)
         self.assertEqual(response.json()['is_referent'], False)
         self.assertEqual(response.json()['is_representant'], False)
 
+    def test__add_duplicated_member(self):
+        body = {
+            'worker': self.id_worker,
+            'team': self.id_team
+        }
+        self.client.login(username='username', password='password')
+        response = self.client.post(
+            self.base_url, data=body
+        )
+
+        self.assertEqual(response.status_code, 400)
+
     def test__remove_member(self):
         self.client.login(username='username', password='password')
         response = self.client.delete(
@@ -122,6 +169,55 @@ class MemberTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), expected)
 
+    def test__list_expand_members(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            self.base_url, {'expand': 'worker,team'}
+        )
+
+        expected = {'count': 1,
+                    'next': None,
+                    'previous': None,
+                    'results':
+                    [
+                        {'worker': {'id': self.id_worker,
+                                    'first_name': 'first_name',
+                                    'last_name': 'last_name',
+                                    'email': 'email@example.com',
+                                    'username': 'username',
+                                    },
+                         'team': {'id': self.id_team,
+                                  'name': 'IT',
+                                  },
+                         'is_referent': False,
+                         'is_representant': False,
+                         'id': self.id_member,
+                         },
+                    ]
+                    }
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test__list_expand_members_queries(self):
+        self.client.login(username='username', password='password')
+        self.client.get(self.base_url, {'expand': 'worker,team'})
+        with CaptureQueriesContext(connection) as one_member:
+            self.client.get(self.base_url, {'expand': 'worker,team'})
+
+        for name in ('ET', 'HR', 'AT'):
+            create_member(
+                worker=create_worker(username=name),
+                team=create_team(name=name)
+            )
+        self.client.get(self.base_url, {'expand': 'worker,team'})
+        with CaptureQueriesContext(connection) as many_members:
+            response = self.client.get(
+                self.base_url, {'expand': 'worker,team'}
+            )
+
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual(len(many_members), len(one_member))
+
     def tearDown(self):
         self.member_relation.delete()
         self.test_team.delete()
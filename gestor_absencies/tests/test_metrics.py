@@ -0,0 +1,114 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from gestor_absencies.common.metrics import registry
+from gestor_absencies.tests.test_helper import (
+    create_absencetype,
+    create_team,
+    create_worker,
+)
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_worker = create_worker()
+        create_team()
+        self.metrics_url = reverse('metrics')
+
+    def get_metrics(self):
+        self.client.login(username='admin', password='password')
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Type'],
+            'text/plain; version=0.0.4; charset=utf-8'
+        )
+        return response.content.decode('utf-8').splitlines()
+
+    def test__requests_are_labelled_by_url_name(self):
+        self.client.login(username='username', password='password')
+        self.client.get(reverse('teams'))
+        self.client.get(reverse('teams'))
+
+        lines = self.get_metrics()
+
+        labels = '{method="GET",status="200",view="teams"}'
+        self.assertIn(
+            'gestor_absencies_requests_total' + labels + ' 2', lines
+        )
+        self.assertIn(
+            'gestor_absencies_request_duration_seconds_count' + labels + ' 2',
+            lines
+        )
+        self.assertIn(
+            'gestor_absencies_request_duration_seconds_bucket'
+            '{le="+Inf",method="GET",status="200",view="teams"} 2',
+            lines
+        )
+        queries = [
+            line for line in lines
+            if line.startswith('gestor_absencies_request_queries_total' +
+                               labels)
+        ]
+        self.assertEqual(len(queries), 1)
+        self.assertGreater(int(queries[0].split()[-1]), 0)
+
+    def test__list_and_detail_views_apart(self):
+        absence_type = create_absencetype()
+        self.client.login(username='username', password='password')
+        self.client.get(reverse('absencetype'))
+        self.client.get(
+            reverse('absencetype_detail', kwargs={'pk': absence_type.pk})
+        )
+
+        lines = self.get_metrics()
+
+        for view in ('absencetype', 'absencetype_detail'):
+            self.assertIn(
+                'gestor_absencies_requests_total'
+                '{{method="GET",status="200",view="{}"}} 1'.format(view),
+                lines
+            )
+
+    def test__response_cache_stats(self):
+        self.client.login(username='username', password='password')
+        self.client.get(reverse('teams'))
+        self.client.get(reverse('teams'))
+
+        lines = self.get_metrics()
+
+        self.assertTrue(any(
+            line.startswith('gestor_absencies_response_cache_requests_total'
+                            '{namespace="gestor_absencies.team",'
+                            'result="hits"}')
+            for line in lines
+        ))
+
+    def test__requests_are_logged(self):
+        self.client.login(username='username', password='password')
+
+        with self.assertLogs('gestor_absencies.common.metrics') as logs:
+            self.client.get(reverse('teams'))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'teams')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['bytes'], 0)
+
+    def test__metrics__worker(self):
+        self.client.login(username='username', password='password')
+
+        response = self.client.get(self.metrics_url)
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(ABSENCIES_METRICS=False)
+    def test__metrics_disabled(self):
+        self.client.login(username='username', password='password')
+        self.client.get(reverse('teams'))
+
+        self.assertEqual(registry.snapshot(), [])
@@ -0,0 +1,191 @@
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from gestor_absencies.absences import delete_absence, update_absence
+from gestor_absencies.models import Member, Notification
+from gestor_absencies.notifications import drain
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def create_worker_with_email(username, email):
+    worker = create_worker(username=username)
+    worker.email = email
+    worker.save()
+    return worker
+
+
+class NotificationTest(TestCase):
+    def setUp(self):
+        self.test_worker = create_worker_with_email(
+            'username', 'worker@example.com'
+        )
+        self.test_referent = create_worker_with_email(
+            'referent', 'referent@example.com'
+        )
+        self.test_representant = create_worker_with_email(
+            'representant', 'representant@example.com'
+        )
+        self.test_team = create_team()
+        create_member(worker=self.test_worker, team=self.test_team)
+        for worker, field in ((self.test_referent, 'is_referent'),
+                              (self.test_representant, 'is_representant')):
+            member = create_member(worker=worker, team=self.test_team)
+            setattr(member, field, True)
+            member.save()
+        self.test_absencetype = create_absencetype()
+
+    def create_absence(self, **kwargs):
+        options = dict(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+        )
+        options.update(kwargs)
+        return create_absence(**options)
+
+    def test__absence_queues_notifications(self):
+        absence = self.create_absence()
+
+        notifications = Notification.objects.order_by('recipient')
+        self.assertEqual(
+            [(n.recipient, n.event, n.status) for n in notifications],
+            [('referent@example.com', 'created', 'pending'),
+             ('representant@example.com', 'created', 'pending')]
+        )
+        self.assertEqual(notifications[0].absence, absence)
+        self.assertIn('2019-04-01 09:00 - 2019-04-01 17:00',
+                      notifications[0].body)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test__not_required_notify(self):
+        absence_type = create_absencetype(abbr='baix', label='Baixa')
+        absence_type.required_notify = False
+        absence_type.save()
+
+        self.create_absence(absence_type=absence_type)
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test__other_teams_are_not_notified(self):
+        other = create_worker_with_email('other', 'other@example.com')
+        Member.objects.filter(worker=self.test_worker).delete()
+        create_member(worker=other, team=create_team(name='Other'))
+
+        self.create_absence()
+
+        self.assertFalse(Notification.objects.exists())
+
+    def test__rejected_absence_queues_nothing(self):
+        self.create_absence()
+        Notification.objects.all().delete()
+        self.client.login(username='username', password='password')
+
+        response = self.client.post(reverse('absences'), {
+            'worker': self.test_worker.pk,
+            'absence_type': self.test_absencetype.pk,
+            'start_time': '2019-04-01T10:00:00Z',
+            'end_time': '2019-04-01T12:00:00Z',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Notification.objects.exists())
+
+    def test__drain_sends_mails(self):
+        self.create_absence()
+        out = StringIO()
+
+        call_command('drain_notifications', once=True, stdout=out)
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['referent@example.com', 'representant@example.com']
+        )
+        self.assertIn('new absence', mail.outbox[0].subject)
+        self.assertEqual(
+            Notification.objects.filter(status='sent').count(), 2
+        )
+        self.assertIn('Done: sent 2, failed 0.', out.getvalue())
+
+    def test__drain_twice_sends_once(self):
+        self.create_absence()
+
+        drain()
+        drain()
+
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test__pending_changes_are_superseded(self):
+        absence = self.create_absence()
+        update_absence(
+            absence,
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 2, 9),
+            end_time=aware(2019, 4, 2, 17),
+        )
+
+        sent, failed = drain()
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertTrue(all(
+            'absence changed' in message.subject for message in mail.outbox
+        ))
+        self.assertEqual(
+            Notification.objects.filter(status='superseded').count(), 2
+        )
+
+    def test__deleted_absence(self):
+        absence = self.create_absence()
+        drain()
+
+        delete_absence(absence)
+        drain()
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertIn('absence cancelled', mail.outbox[-1].subject)
+        self.assertIn('2019-04-01 09:00', mail.outbox[-1].body)
+
+    def test__failed_mails_are_retried(self):
+        self.create_absence()
+
+        with mock.patch(
+            'gestor_absencies.notifications.send_mail',
+            side_effect=OSError('connection refused')
+        ):
+            sent, failed = drain(max_attempts=2)
+
+        self.assertEqual((sent, failed), (0, 2))
+        notification = Notification.objects.first()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.last_error, 'connection refused')
+        self.assertGreater(notification.next_attempt, timezone.now())
+        self.assertEqual(drain(), (0, 0))
+
+        Notification.objects.update(next_attempt=timezone.now())
+        with mock.patch(
+            'gestor_absencies.notifications.send_mail',
+            side_effect=OSError('connection refused')
+        ):
+            drain(max_attempts=2)
+
+        self.assertEqual(
+            Notification.objects.filter(status='failed').count(), 2
+        )
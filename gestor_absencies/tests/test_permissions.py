@@ -0,0 +1,55 @@
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from gestor_absencies.common.absencies_perm import get_cached_permissions
+from gestor_absencies.common.default_permissions import (
+    DEFAULT_WORKER_GROUP,
+    DEFAULT_WORKER_PERMISSIONS
+)
+from gestor_absencies.tests.test_helper import create_worker
+
+
+class DefaultPermissionsTest(TestCase):
+    def setUp(self):
+        self.test_worker = create_worker()
+
+    def test__default_group_on_create(self):
+        groups = self.test_worker.groups.values_list('name', flat=True)
+
+        self.assertEqual(list(groups), [DEFAULT_WORKER_GROUP])
+        self.assertFalse(self.test_worker.user_permissions.exists())
+        self.assertEqual(
+            get_cached_permissions(self.test_worker),
+            {'gestor_absencies.' + codename
+             for codename in DEFAULT_WORKER_PERMISSIONS}
+        )
+
+    def test__resave_without_permission_queries(self):
+        self.test_worker.email = 'newmail@example.com'
+        with self.assertNumQueries(1):
+            self.test_worker.save()
+
+    def test__cached_permissions_skip_queries(self):
+        get_cached_permissions(self.test_worker)
+        with self.assertNumQueries(0):
+            get_cached_permissions(self.test_worker)
+
+    @override_settings(ABSENCIES_VERSIONED_CACHE_TTL=0)
+    def test__cached_permissions_expire(self):
+        get_cached_permissions(self.test_worker)
+        with self.assertNumQueries(1):
+            get_cached_permissions(self.test_worker)
+
+    def test__cached_permissions_invalidated(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(reverse('vacationpolicy'))
+        self.assertEqual(response.status_code, 403)
+
+        self.test_worker.user_permissions.add(
+            Permission.objects.get(codename='view_vacationpolicy')
+        )
+        response = self.client.get(reverse('vacationpolicy'))
+        self.assertEqual(response.status_code, 200)
+
+    def tearDown(self):
+        self.test_worker.delete()
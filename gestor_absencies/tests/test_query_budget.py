@@ -0,0 +1,110 @@
+from django.test import TestCase
+from django.urls import reverse
+from gestor_absencies.models import (
+    SomEnergiaAbsence,
+    SomEnergiaAbsenceType,
+    Team,
+    VacationPolicy,
+    Worker
+)
+from gestor_absencies.tests.query_budget import QueryBudgetMixin
+from gestor_absencies.tests.test_helper import create_worker
+
+
+def latest_url(name, model):
+    return lambda: reverse(
+        name, kwargs={'pk': model.objects.order_by('-pk').first().pk}
+    )
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        super(QueryBudgetTest, self).setUp()
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.client.login(username='admin', password='password')
+
+    def test__workers(self):
+        self.assertConstantQueries(reverse('workers'))
+
+    def test__workers_cursor(self):
+        self.assertConstantQueries(
+            reverse('workers'), {'pagination': 'cursor'}
+        )
+
+    def test__workers_detail(self):
+        self.assertConstantQueries(latest_url('workers_detail', Worker))
+
+    def test__workers_calendar(self):
+        self.assertConstantQueries(latest_url('workers_calendar', Worker))
+
+    def test__teams(self):
+        self.assertConstantQueries(reverse('teams'))
+
+    def test__teams_detail(self):
+        self.assertConstantQueries(latest_url('teams_detail', Team))
+
+    def test__teams_availability(self):
+        self.assertConstantQueries(
+            lambda: reverse('teams_availability',
+                            kwargs={'pk': self.test_team.pk}),
+            {'start': '2019-04-01', 'end': '2019-06-30'}
+        )
+
+    def test__teams_calendar(self):
+        self.assertConstantQueries(
+            lambda: reverse('teams_calendar', kwargs={'pk': self.test_team.pk})
+        )
+
+    def test__members(self):
+        self.assertConstantQueries(reverse('members'))
+
+    def test__members_expanded(self):
+        self.assertConstantQueries(
+            reverse('members'), {'expand': 'worker,team'}
+        )
+
+    def test__members_detail(self):
+        self.assertConstantQueries(
+            lambda: reverse('members_detail', kwargs={
+                'pk': self.test_team.member_set.order_by('-pk').first().pk
+            }),
+            {'expand': 'worker,team'}
+        )
+
+    def test__vacationpolicy(self):
+        self.assertConstantQueries(reverse('vacationpolicy'))
+
+    def test__vacationpolicy_detail(self):
+        self.assertConstantQueries(
+            latest_url('vacationpolicy_detail', VacationPolicy)
+        )
+
+    def test__absencetype(self):
+        self.assertConstantQueries(reverse('absencetype'))
+
+    def test__absencetype_detail(self):
+        self.assertConstantQueries(
+            latest_url('absencetype_detail', SomEnergiaAbsenceType)
+        )
+
+    def test__absences(self):
+        self.assertConstantQueries(reverse('absences'))
+
+    def test__absences_filtered(self):
+        self.assertConstantQueries(
+            reverse('absences'), {'start': '2019-04-01', 'end': '2019-05-01'}
+        )
+
+    def test__absences_detail(self):
+        self.assertConstantQueries(
+            latest_url('absences_detail', SomEnergiaAbsence)
+        )
+
+    def test__sync(self):
+        self.assertConstantQueries(reverse('sync'))
+
+    def test__reports_absences(self):
+        self.assertConstantQueries(
+            reverse('reports_absences'),
+            {'year': '2019', 'group_by': 'team,worker,type,month'}
+        )
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class AbsenceReportTest(TestCase):
+    def setUp(self):
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_worker = create_worker(username='username')
+        self.test_other_worker = create_worker(username='other')
+        self.test_team = create_team(name='IT')
+        self.test_other_team = create_team(name='ET')
+        create_member(worker=self.test_worker, team=self.test_team)
+        create_member(worker=self.test_worker, team=self.test_other_team)
+        create_member(worker=self.test_other_worker, team=self.test_team)
+        self.test_holidays = create_absencetype()
+        self.test_leave = create_absencetype(
+            abbr='baix', label='Baixa', spend_days=False
+        )
+        self.url = reverse('reports_absences')
+
+        # two full days and a half day in April, a three day leave in May
+        self.add(self.test_worker, self.test_holidays, (2019, 4, 1, 9), 8,
+                 freq='daily', count=2)
+        self.add(self.test_other_worker, self.test_holidays,
+                 (2019, 4, 10, 9), 4)
+        self.add(self.test_other_worker, self.test_leave,
+                 (2019, 5, 6, 0), 72)
+        # not approved or out of the year, not reported
+        self.add(self.test_worker, self.test_holidays, (2019, 4, 20, 9), 8,
+                 status=None)
+        self.add(self.test_worker, self.test_holidays, (2019, 4, 21, 9), 8,
+                 status='rejected')
+        self.add(self.test_worker, self.test_holidays, (2018, 12, 31, 9), 8)
+        self.add(self.test_worker, self.test_holidays, (2020, 1, 1, 9), 8)
+
+    def add(self, worker, absence_type, start, hours, status='approved',
+            **recurrence):
+        start_time = aware(*start)
+        return create_absence(
+            worker=worker,
+            absence_type=absence_type,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=hours),
+            status=status,
+            **recurrence
+        )
+
+    def get(self, **params):
+        self.client.login(username='admin', password='password')
+        return self.client.get(self.url, dict(params, year=2019))
+
+    def test__report_by_team_type_month(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'year': 2019,
+            'group_by': ['team', 'type', 'month'],
+            'results': [
+                {'team': self.test_team.pk, 'team_name': 'IT',
+                 'type': self.test_holidays.pk, 'type_label': 'Vacances',
+                 'month': 4, 'occurrences': 3, 'days': 2.5, 'hours': 20.0},
+                {'team': self.test_team.pk, 'team_name': 'IT',
+                 'type': self.test_leave.pk, 'type_label': 'Baixa',
+                 'month': 5, 'occurrences': 1, 'days': 3.0, 'hours': 72.0},
+                {'team': self.test_other_team.pk, 'team_name': 'ET',
+                 'type': self.test_holidays.pk, 'type_label': 'Vacances',
+                 'month': 4, 'occurrences': 2, 'days': 2.0, 'hours': 16.0},
+            ],
+        })
+
+    def test__report_by_month(self):
+        response = self.get(group_by='month')
+
+        self.assertEqual(response.json()['results'], [
+            {'month': 4, 'occurrences': 3, 'days': 2.5, 'hours': 20.0},
+            {'month': 5, 'occurrences': 1, 'days': 3.0, 'hours': 72.0},
+        ])
+
+    def test__report_by_worker(self):
+        response = self.get(group_by='worker')
+
+        self.assertEqual(response.json()['results'], [
+            {'worker': self.test_worker.pk, 'worker_username': 'username',
+             'occurrences': 2, 'days': 2.0, 'hours': 16.0},
+            {'worker': self.test_other_worker.pk, 'worker_username': 'other',
+             'occurrences': 2, 'days': 3.5, 'hours': 76.0},
+        ])
+
+    def test__report_csv(self):
+        response = self.get(group_by='type,month', output='csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(
+            b''.join(response.streaming_content).decode('utf-8').splitlines(),
+            [
+                'type,type_label,month,occurrences,days,hours',
+                '{},Vacances,4,3,2.5,20.0'.format(self.test_holidays.pk),
+                '{},Baixa,5,1,3.0,72.0'.format(self.test_leave.pk),
+            ]
+        )
+
+    def test__report_accept_csv(self):
+        self.client.login(username='admin', password='password')
+        response = self.client.get(
+            self.url, {'year': 2019, 'group_by': 'month'},
+            HTTP_ACCEPT='text/csv'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b''.join(response.streaming_content).decode('utf-8').splitlines(),
+            ['month,occurrences,days,hours', '4,3,2.5,20.0', '5,1,3.0,72.0']
+        )
+
+    def test__report_wrong_params(self):
+        for params in ({'group_by': 'team,color'}, {'group_by': 'team,team'},
+                       {'group_by': ','}, {'output': 'xls'},
+                       {'year': 'last'}, {'year': '0'}):
+            self.client.login(username='admin', password='password')
+            response = self.client.get(self.url, params)
+
+            self.assertEqual(response.status_code, 400, params)
+
+    def test__report__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(self.url, {'year': 2019})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test__report__anonymous(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from gestor_absencies.models import Team, Tombstone, Worker
+from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
+    create_team,
+    create_worker,
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@override_settings(ABSENCIES_SYNC_OVERLAP=0)
+class SyncTest(TestCase):
+    def setUp(self):
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_worker = create_worker()
+        self.test_team = create_team()
+        self.test_member = create_member(
+            worker=self.test_worker, team=self.test_team
+        )
+        self.test_absencetype = create_absencetype()
+        self.test_absence = create_absence(
+            worker=self.test_worker,
+            absence_type=self.test_absencetype,
+            start_time=aware(2019, 4, 1, 9),
+            end_time=aware(2019, 4, 1, 17),
+        )
+        self.base_url = reverse('sync')
+
+    def sync(self, since=None):
+        params = {'since': since} if since else {}
+        response = self.client.get(self.base_url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test__sync__first(self):
+        self.client.login(username='admin', password='password')
+        result = self.sync()
+
+        self.assertIsNone(result['since'])
+        self.assertEqual(
+            [worker['username'] for worker in result['upserts']['workers']],
+            ['admin', 'username']
+        )
+        self.assertEqual(
+            [team['id'] for team in result['upserts']['teams']],
+            [self.test_team.pk]
+        )
+        self.assertEqual(
+            [absence['id'] for absence in result['upserts']['absences']],
+            [self.test_absence.pk]
+        )
+        self.assertEqual(result['tombstones']['teams'], [])
+        self.assertIsNone(result['next'])
+
+    def test__sync__changes_since_last_sync(self):
+        self.client.login(username='admin', password='password')
+        until = self.sync()['until']
+
+        self.test_team.name = 'Renamed'
+        self.test_team.save()
+        absence_pk = self.test_absence.pk
+        self.test_absence.delete()
+        result = self.sync(until)
+
+        self.assertEqual(result['since'], until)
+        self.assertEqual(
+            [team['name'] for team in result['upserts']['teams']],
+            ['Renamed']
+        )
+        self.assertEqual(result['upserts']['workers'], [])
+        self.assertEqual(result['upserts']['absences'], [])
+        self.assertEqual(
+            result['tombstones']['absences'], [absence_pk]
+        )
+
+    def test__sync__cascaded_deletions(self):
+        self.client.login(username='admin', password='password')
+        until = self.sync()['until']
+
+        Team.objects.filter(pk=self.test_team.pk).delete()
+        result = self.sync(until)
+
+        self.assertEqual(result['tombstones']['teams'], [self.test_team.pk])
+        self.assertEqual(
+            result['tombstones']['members'], [self.test_member.pk]
+        )
+
+    def test__sync__only_viewable_models(self):
+        self.client.login(username='username', password='password')
+        result = self.sync()
+
+        self.assertNotIn('vacationpolicies', result['upserts'])
+        self.assertIn('absences', result['upserts'])
+
+    def test__sync__steady_state_queries(self):
+        self.client.login(username='admin', password='password')
+        until = self.sync()['until']
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.sync(until)
+
+        self.assertTrue(all(not rows for rows in result['upserts'].values()))
+        # session and user, one range scan per model and the tombstones
+        self.assertEqual(len(queries), 9)
+
+    @override_settings(ABSENCIES_SYNC_OVERLAP=60)
+    def test__sync__late_commits_are_returned(self):
+        self.client.login(username='admin', password='password')
+        until = self.sync()['until']
+
+        # a change stamped before the previous sync but committed after it
+        Team.objects.filter(pk=self.test_team.pk).update(
+            name='Late',
+            modified_date=timezone.now() - timedelta(seconds=30)
+        )
+        result = self.sync(until)
+
+        self.assertEqual(
+            [team['name'] for team in result['upserts']['teams']], ['Late']
+        )
+
+    def test__sync__expired_since(self):
+        self.client.login(username='admin', password='password')
+        since = (timezone.now() - timedelta(days=91)).isoformat()
+
+        response = self.client.get(self.base_url, {'since': since})
+
+        self.assertEqual(response.status_code, 410)
+
+    @override_settings(ABSENCIES_SYNC_PAGE_SIZE=2)
+    def test__sync__first_paged(self):
+        for name in ('A', 'B', 'C'):
+            create_team(name=name)
+        self.client.login(username='admin', password='password')
+
+        pages = [self.sync()]
+        while pages[-1]['next']:
+            response = self.client.get(
+                self.base_url, {'cursor': pages[-1]['next']}
+            )
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+
+        self.assertTrue(all(
+            sum(len(rows) for rows in page['upserts'].values()) <= 2
+            for page in pages
+        ))
+        self.assertEqual(len({page['until'] for page in pages}), 1)
+        teams = [
+            team['id'] for page in pages for team in page['upserts']['teams']
+        ]
+        self.assertEqual(teams, list(
+            Team.objects.order_by('pk').values_list('pk', flat=True)
+        ))
+        workers = [
+            worker['id']
+            for page in pages for worker in page['upserts']['workers']
+        ]
+        self.assertEqual(workers, list(
+            Worker.objects.order_by('pk').values_list('pk', flat=True)
+        ))
+
+    def test__sync__invalid_cursor(self):
+        self.client.login(username='admin', password='password')
+        response = self.client.get(self.base_url, {'cursor': 'teams:1'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__prune_tombstones(self):
+        self.test_worker.delete()
+        for object_id in (1, 2):
+            Tombstone.objects.create(
+                model='gestor_absencies.team', object_id=object_id
+            )
+        Tombstone.objects.filter(model='gestor_absencies.team').update(
+            deleted_date=timezone.now() - timedelta(days=91)
+        )
+        out = StringIO()
+
+        call_command('prune_tombstones', stdout=out)
+
+        # the latest one of each model is kept
+        self.assertEqual(list(Tombstone.objects.filter(
+            model='gestor_absencies.team'
+        ).values_list('object_id', flat=True)), [2])
+        self.assertTrue(
+            Tombstone.objects.filter(model='gestor_absencies.worker').exists()
+        )
+        self.assertIn('Pruned 1 tombstones.', out.getvalue())
+
+    def test__sync__invalid_since(self):
+        self.client.login(username='admin', password='password')
+        response = self.client.get(self.base_url, {'since': 'yesterday'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test__sync__anonymous(self):
+        response = self.client.get(self.base_url)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test__tombstone_on_delete(self):
+        pk = self.test_worker.pk
+        self.test_worker.delete()
+
+        self.assertTrue(Tombstone.objects.filter(
+            model='gestor_absencies.worker', object_id=pk
+        ).exists())
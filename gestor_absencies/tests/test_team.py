@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta
 from os.path import join
 from django.urls import reverse
 from django.test import TestCase
+from django.utils import timezone
+from gestor_absencies.models import Team
 from gestor_absencies.tests.test_helper import (
+    create_absence,
+    create_absencetype,
+    create_member,
     create_worker,
     create_team,
 )
@@ -33,6 +39,29 @@ class TeamTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), expected)
 
+    def test__team_list_cursor__admin(self):
+        other_teams = [create_team(name=name) for name in ('ET', 'HR')]
+        self.client.login(username='admin', password='password')
+        response = self.client.get(
+            self.base_url, {'pagination': 'cursor', 'page_size': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.json())
+        self.assertEqual(
+            [team['id'] for team in response.json()['results']],
+            [self.id_team, other_teams[0].pk]
+        )
+
+        response = self.client.get(response.json()['next'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [team['id'] for team in response.json()['results']],
+            [other_teams[1].pk]
+        )
+        self.assertIsNone(response.json()['next'])
+
     def test__team_get__admin(self):
         self.client.login(username='admin', password='password')
         response = self.client.get(
@@ -81,6 +110,111 @@ class TeamTest(TestCase):
         )
         self.assertEqual(response.status_code, 204)
 
+    def test__team_list_not_modified__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(self.base_url)
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.base_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        create_team(name='ET')
+        response = self.client.get(self.base_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test__team_list_modified_by_deletion__worker(self):
+        other = create_team(name='ET')
+        Team.objects.update(
+            modified_date=timezone.now() - timedelta(minutes=5)
+        )
+        self.client.login(username='username', password='password')
+        last_modified = self.client.get(self.base_url)['Last-Modified']
+
+        other.delete()
+        response = self.client.get(
+            self.base_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test__team_get_not_modified__worker(self):
+        url = join(self.base_url, str(self.id_team))
+        self.client.login(username='username', password='password')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.test_team.name = 'ET'
+        self.test_team.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'ET')
+
+    def test__team_availability__worker(self):
+        self.test_team.min_worker = 2
+        self.test_team.save()
+        create_member(worker=self.test_worker, team=self.test_team)
+        create_member(worker=self.test_admin, team=self.test_team)
+        absencetype = create_absencetype()
+        for day, count in ((2, 2), (3, 1)):
+            create_absence(
+                worker=self.test_worker,
+                absence_type=absencetype,
+                start_time=timezone.make_aware(datetime(2019, 4, day, 9)),
+                end_time=timezone.make_aware(datetime(2019, 4, day, 17)),
+                freq='daily',
+                count=count,
+                status='approved',
+            )
+        # pending absences do not count yet
+        create_absence(
+            worker=self.test_admin,
+            absence_type=absencetype,
+            start_time=timezone.make_aware(datetime(2019, 4, 4, 9)),
+            end_time=timezone.make_aware(datetime(2019, 4, 4, 17)),
+        )
+
+        self.client.login(username='username', password='password')
+        with self.assertNumQueries(6):
+            response = self.client.get(
+                join(self.base_url, str(self.id_team), 'availability'),
+                {'start': '2019-04-01', 'end': '2019-04-04'}
+            )
+
+        expected = {'team': self.id_team,
+                    'min_worker': 2,
+                    'days': [
+                        {'date': '2019-04-01', 'present': 2, 'absent': 0,
+                         'below_min_worker': False},
+                        {'date': '2019-04-02', 'present': 1, 'absent': 1,
+                         'below_min_worker': True},
+                        {'date': '2019-04-03', 'present': 1, 'absent': 1,
+                         'below_min_worker': True},
+                        {'date': '2019-04-04', 'present': 2, 'absent': 0,
+                         'below_min_worker': False},
+                    ]
+                    }
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test__team_availability_wrong_range__worker(self):
+        self.client.login(username='username', password='password')
+        response = self.client.get(
+            join(self.base_url, str(self.id_team), 'availability'),
+            {'start': '2019-04-04', 'end': '2019-04-01'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
     def test__team_list__worker(self):
         self.client.login(username='username', password='password')
         response = self.client.get(
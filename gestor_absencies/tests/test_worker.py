@@ -1,7 +1,11 @@
+import codecs
 from os.path import join
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from django.test import TestCase
-from gestor_absencies.tests.test_helper import create_worker
+from django.utils import timezone
+from gestor_absencies.models import Member, Worker
+from gestor_absencies.tests.test_helper import create_team, create_worker
 
 
 class AdminTest(TestCase):
@@ -66,6 +70,11 @@ class AdminTest(TestCase):
                     'email': 'email@example.com',
                     'username': 'username',
                     'id': self.id_worker,
+                    'holiday_balance': {'year': timezone.now().year,
+                                        'allowance': 0,
+                                        'spent_days': '0.0',
+                                        'remaining_days': '0.0',
+                                        },
                     }
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), expected)
@@ -161,6 +170,11 @@ class AdminTest(TestCase):
                     'email': 'email@example.com',
                     'username': 'username',
                     'id': self.id_worker,
+                    'holiday_balance': {'year': timezone.now().year,
+                                        'allowance': 0,
+                                        'spent_days': '0.0',
+                                        'remaining_days': '0.0',
+                                        },
                     }
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), expected)
@@ -168,3 +182,93 @@ class AdminTest(TestCase):
     def tearDown(self):
         self.test_worker.delete()
         self.test_admin.delete()
+
+
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        self.test_admin = create_worker(username='admin', is_admin=True)
+        self.test_team = create_team()
+        self.base_url = reverse('workers_bulk')
+
+    def test__bulk_import_csv(self):
+        upload = SimpleUploadedFile('workers.csv', '\n'.join([
+            'username,first_name,last_name,email,password,teams',
+            'peli,Pelayo,Manzano,peli@example.com,yalo,{}'.format(
+                self.test_team.pk
+            ),
+            'admin,Admin,Admin,admin@example.com,password,',
+            'nopass,No,Password,nopass@example.com,,',
+            'lola,Lola,Flores,lola@example.com,flores,999',
+        ]).encode('utf-8'))
+        self.client.login(username='admin', password='password')
+        response = self.client.post(self.base_url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(
+            [error['row'] for error in response.json()['errors']],
+            [3, 4, 5]
+        )
+        worker = Worker.objects.get(username='peli')
+        self.assertTrue(worker.check_password('yalo'))
+        self.assertTrue(worker.groups.exists())
+        self.assertTrue(
+            Member.objects.filter(worker=worker, team=self.test_team).exists()
+        )
+
+    def test__bulk_import_jsonl(self):
+        upload = SimpleUploadedFile('workers.jsonl', '\n'.join([
+            '{"username": "peli", "password": "yalo", "teams": [%d]}' %
+            self.test_team.pk,
+            '{"username": "peli", "password": "yalo"}',
+            'not json',
+        ]).encode('utf-8'))
+        self.client.login(username='admin', password='password')
+        response = self.client.post(self.base_url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(
+            [error['row'] for error in response.json()['errors']],
+            [2, 3]
+        )
+
+    def test__bulk_import_csv_bom_and_invalid_utf8(self):
+        upload = SimpleUploadedFile('workers.csv', b'\r\n'.join([
+            codecs.BOM_UTF8 + b'username,password',
+            b'peli,yalo',
+            b'l\xf2la,flores',
+            b'anna,secret',
+        ]))
+        self.client.login(username='admin', password='password')
+        response = self.client.post(self.base_url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['errors'], [{
+            'row': 3,
+            'errors': {'non_field_errors': ['Invalid UTF-8 text.']},
+        }])
+
+    def test__bulk_import_jsonl_invalid_utf8(self):
+        upload = SimpleUploadedFile('workers.jsonl', b'\n'.join([
+            b'{"username": "l\xf2la", "password": "flores"}',
+            b'{"username": "peli", "password": "yalo"}',
+        ]))
+        self.client.login(username='admin', password='password')
+        response = self.client.post(self.base_url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(
+            [error['row'] for error in response.json()['errors']], [1]
+        )
+
+    def test__bulk_import__worker(self):
+        create_worker()
+        upload = SimpleUploadedFile('workers.csv', b'username,password\n')
+        self.client.login(username='username', password='password')
+        response = self.client.post(self.base_url, {'file': upload})
+
+        self.assertEqual(response.status_code, 403)
@@ -17,15 +17,27 @@ urlpatterns = [
     path('workers',
          views.WorkerViewSet.as_view(base_methods),
          name='workers'),
+    path('workers/bulk',
+         views.WorkerViewSet.as_view({'post': 'bulk_import'}),
+         name='workers_bulk'),
     path('workers/<int:pk>',
          views.WorkerViewSet.as_view(datail_methods),
          name='workers_detail'),
+    path('workers/<int:pk>/calendar.ics',
+         views.WorkerViewSet.as_view({'get': 'calendar'}),
+         name='workers_calendar'),
     path('teams',
          views.TeamViewSet.as_view(base_methods),
          name='teams'),
     path('teams/<int:pk>',
          views.TeamViewSet.as_view(datail_methods),
          name='teams_detail'),
+    path('teams/<int:pk>/availability',
+         views.TeamViewSet.as_view({'get': 'availability'}),
+         name='teams_availability'),
+    path('teams/<int:pk>/calendar.ics',
+         views.TeamViewSet.as_view({'get': 'calendar'}),
+         name='teams_calendar'),
     path('members',
          views.MemberViewSet.as_view(base_methods),
          name='members'),
@@ -43,5 +55,26 @@ urlpatterns = [
          name='absencetype'),
     path('absencetype/<int:pk>',
          views.SomEnergiaAbsenceTypeViewSet.as_view(datail_methods),
-         name='absencetype'),
+         name='absencetype_detail'),
+    path('absences',
+         views.SomEnergiaAbsenceViewSet.as_view(base_methods),
+         name='absences'),
+    path('absences/check',
+         views.SomEnergiaAbsenceViewSet.as_view({'post': 'check'}),
+         name='absences_check'),
+    path('absences/approve',
+         views.SomEnergiaAbsenceViewSet.as_view({'post': 'approve'}),
+         name='absences_approve'),
+    path('absences/<int:pk>',
+         views.SomEnergiaAbsenceViewSet.as_view(datail_methods),
+         name='absences_detail'),
+    path('sync',
+         views.SyncView.as_view(),
+         name='sync'),
+    path('reports/absences',
+         views.AbsenceReportView.as_view(),
+         name='reports_absences'),
+    path('metrics',
+         views.MetricsView.as_view(),
+         name='metrics'),
 ]
@@ -1,6 +1,9 @@
 import logging
+from collections import OrderedDict
+from datetime import datetime, time
 
 from .models import (
+    HolidayBalance,
     Worker,
     Member,
     Team,
@@ -10,25 +13,183 @@ from .models import (
     VacationPolicy
 )
 from rest_framework import viewsets
+from gestor_absencies.common.absencies_perm import IsSuperUser
+from gestor_absencies.common.conditional import (
+    ConditionalGetMixin,
+    conditional_response,
+    latest,
+    make_etag,
+    set_conditional_headers
+)
+from gestor_absencies.common.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    render_metrics
+)
+from gestor_absencies.common.pagination import CursorPaginationMixin
+from gestor_absencies.common.renderers import CalendarRenderer, CSVRenderer
+from gestor_absencies.common.response_cache import CachedResponseMixin
 from .serializers import (
+    AbsenceApprovalSerializer,
     CreateWorkerSerializer,
+    WorkerDetailSerializer,
     WorkerSerializer,
     MemberSerializer,
     TeamSerializer,
+    SomEnergiaAbsenceSerializer,
     SomEnergiaAbsenceTypeSerializer,
     VacationPolicySerializer
 )
+from .absences import delete_absence
+from .approvals import (
+    coverage_violations,
+    duration_errors,
+    set_status,
+    unauthorized_absences
+)
+from .calendars import (
+    CALENDAR_CONTENT_TYPE,
+    render_calendar,
+    team_calendar_occurrences,
+    team_calendar_version,
+    worker_calendar_occurrences,
+    worker_calendar_version
+)
+from .availability import MAX_AVAILABILITY_DAYS, team_availability
+from .conflicts import find_conflicts, find_teammates_off
+from .reports import (
+    CSV_CONTENT_TYPE,
+    REPORT_GROUPS,
+    absence_report,
+    render_csv,
+    report_columns
+)
+from .sync import (
+    get_changes,
+    get_snapshot,
+    is_expired,
+    read_snapshot_cursor
+)
+from .importers import (
+    IMPORT_FORMATS,
+    WorkerImport,
+    get_import_format,
+    read_rows
+)
+from django.core import signing
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
 logger = logging.getLogger(__name__)
 
 
-class WorkerViewSet(viewsets.ModelViewSet):
+def get_id_list(params, name):
+    """Return the ids of a query parameter given as 'a=1,2' or 'a=1&a=2'."""
+    try:
+        return [
+            int(value)
+            for param in params.getlist(name)
+            for value in param.split(',') if value
+        ]
+    except ValueError:
+        raise ValidationError({name: ['Expected a list of ids.']})
+
+
+def get_date(params, name):
+    """Return a required query parameter given as an ISO date."""
+    value = params.get(name)
+    if not value:
+        raise ValidationError({name: ['This parameter is required.']})
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ['Expected an ISO date.']})
+    return parsed
+
+
+def get_datetime(params, name):
+    """Return a query parameter given as an ISO date or datetime."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed = datetime.combine(parse_date(value), time.min)
+    except (TypeError, ValueError):
+        raise ValidationError({name: ['Expected an ISO date or datetime.']})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def calendar_response(request, name, occurrences, version):
+    """Stream an iCalendar feed, or answer 304 if the client copy is fresh."""
+    etag = make_etag(request.get_full_path(), *sorted(version.items()))
+    last_modified = version['last_modified']
+    response = conditional_response(request, etag, last_modified)
+    if response is None:
+        response = StreamingHttpResponse(
+            render_calendar(name, occurrences, request.get_host()),
+            content_type=CALENDAR_CONTENT_TYPE
+        )
+    return set_conditional_headers(response, etag, last_modified)
+
+
+class WorkerViewSet(ConditionalGetMixin, CursorPaginationMixin,
+                     viewsets.ModelViewSet):
     queryset = Worker.objects.all()
     serializer_class = WorkerSerializer
 
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return Worker.objects.select_related('vacation_policy')
+        return Worker.objects.all()
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return WorkerDetailSerializer
+        return WorkerSerializer
+
+    def get_object_version(self, instance):
+        """The worker, its vacation policy and its holiday balance of the
+        year, all of them part of the detail response."""
+        version = super(WorkerViewSet, self).get_object_version(instance)
+        spent_days, balance_modified = HolidayBalance.objects.filter(
+            worker=instance, year=self.get_serializer_context()['year']
+        ).values_list('spent_days', 'modified_date').first() or (None, None)
+        policy = instance.vacation_policy
+        version.update(
+            holiday_balance=spent_days,
+            holidays=instance.holidays,
+            vacation_policy=policy and (policy.pk, policy.holidays),
+            last_modified=latest(
+                instance.modified_date,
+                policy and policy.modified_date,
+                balance_modified
+            ),
+        )
+        return version
+
+    def get_serializer_context(self):
+        context = super(WorkerViewSet, self).get_serializer_context()
+        year = self.request.query_params.get('year')
+        try:
+            context['year'] = int(year) if year else timezone.now().year
+        except ValueError:
+            raise ValidationError({'year': ['Expected a year.']})
+        return context
+
     def create(self, request, *args, **kwargs):
         serializer = CreateWorkerSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -40,6 +201,43 @@ class WorkerViewSet(viewsets.ModelViewSet):
             headers=headers
         )
 
+    def bulk_import(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'file': ['This field is required.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        file_format = get_import_format(upload, request.data.get('format'))
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'format': ['Unknown format, use one of: {}.'.format(
+                    ', '.join(IMPORT_FORMATS)
+                )]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = WorkerImport().run(read_rows(upload, file_format))
+        return Response(
+            {'created': result.created, 'errors': result.errors},
+            status=status.HTTP_200_OK
+        )
+
+    def get_renderers(self):
+        renderers = super(WorkerViewSet, self).get_renderers()
+        if self.action == 'calendar':
+            renderers.append(CalendarRenderer())
+        return renderers
+
+    def calendar(self, request, *args, **kwargs):
+        worker = self.get_object()
+        return calendar_response(
+            request,
+            worker.get_full_name() or worker.username,
+            worker_calendar_occurrences(worker),
+            worker_calendar_version(worker)
+        )
+
     # def get_object(self):
     #     obj = get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
     #     logger.debug(self.kwargs["pk"])
@@ -60,33 +258,355 @@ class CreateWorkerViewSet(viewsets.ModelViewSet):
     serializer_class = WorkerSerializer
 
 
-class TeamViewSet(viewsets.ModelViewSet):
+class TeamViewSet(CachedResponseMixin, ConditionalGetMixin,
+                  CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
 
+    def availability(self, request, *args, **kwargs):
+        team = self.get_object()
+        start = get_date(request.query_params, 'start')
+        end = get_date(request.query_params, 'end')
+        if end < start:
+            raise ValidationError({'end': ['End must not be before start.']})
+        if (end - start).days >= MAX_AVAILABILITY_DAYS:
+            raise ValidationError({'end': [
+                'The range can not be longer than {} days.'.format(
+                    MAX_AVAILABILITY_DAYS
+                )
+            ]})
+
+        return Response({
+            'team': team.pk,
+            'min_worker': team.min_worker,
+            'days': team_availability(team, start, end),
+        })
 
-class MemberViewSet(viewsets.ModelViewSet):
+    def get_renderers(self):
+        renderers = super(TeamViewSet, self).get_renderers()
+        if self.action == 'calendar':
+            renderers.append(CalendarRenderer())
+        return renderers
+
+    def calendar(self, request, *args, **kwargs):
+        team = self.get_object()
+        return calendar_response(
+            request,
+            team.name,
+            team_calendar_occurrences(team),
+            team_calendar_version(team)
+        )
+
+
+class MemberViewSet(ConditionalGetMixin, CursorPaginationMixin,
+                     viewsets.ModelViewSet):
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
 
+    def get_expand(self):
+        if self.request.method != 'GET':
+            return []
+        expand = self.request.query_params.get('expand', '').split(',')
+        return [
+            field for field in MemberSerializer.expandable_fields
+            if field in expand
+        ]
+
+    def get_list_version(self, queryset):
+        aggregates = {
+            field + '_last_modified': Max(field + '__modified_date')
+            for field in self.get_expand()
+        }
+        version = super(MemberViewSet, self).get_list_version(queryset)
+        if aggregates:
+            version.update(queryset.aggregate(**aggregates))
+        return version
+
+    def get_object_version(self, instance):
+        version = super(MemberViewSet, self).get_object_version(instance)
+        for field in self.get_expand():
+            version[field] = getattr(instance, field).modified_date
+        return version
+
+    def get_serializer_context(self):
+        context = super(MemberViewSet, self).get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
     def get_queryset(self):
-        queryset = Member.objects.all()
-        team = self.request.query_params.get('team')
-        worker = self.request.query_params.get('worker')
+        queryset = Member.objects.select_related(*self.get_expand())
+        params = self.request.query_params
+
+        for field in ('team', 'worker'):
+            ids = get_id_list(params, field)
+            if ids:
+                queryset = queryset.filter(**{field + '__in': ids})
 
-        if team:
-            queryset = queryset.filter(team=team)
-        elif worker:
-            queryset = queryset.filter(worker=worker)
+        for field in ('is_referent', 'is_representant'):
+            value = params.get(field)
+            if value is not None:
+                queryset = queryset.filter(
+                    **{field: value.lower() in ('true', '1')}
+                )
 
         return queryset
 
 
-class VacationPolicyViewSet(viewsets.ModelViewSet):
+class VacationPolicyViewSet(CachedResponseMixin, ConditionalGetMixin,
+                            viewsets.ModelViewSet):
     queryset = VacationPolicy.objects.all()
     serializer_class = VacationPolicySerializer
 
 
-class SomEnergiaAbsenceTypeViewSet(viewsets.ModelViewSet):
+class SomEnergiaAbsenceTypeViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = SomEnergiaAbsenceType.objects.all()
     serializer_class = SomEnergiaAbsenceTypeSerializer
+
+
+class SomEnergiaAbsenceViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
+    queryset = SomEnergiaAbsence.objects.all()
+    serializer_class = SomEnergiaAbsenceSerializer
+
+    def get_queryset(self):
+        queryset = SomEnergiaAbsence.objects.prefetch_related(
+            Prefetch(
+                'somenergiaoccurrence_set',
+                queryset=SomEnergiaOccurrence.objects.order_by('start_time')
+            )
+        ).order_by('pk')
+        params = self.request.query_params
+
+        user = self.request.user
+        if self.request.method != 'GET' and not user.is_superuser:
+            queryset = queryset.filter(worker=user)
+
+        for field in ('worker', 'absence_type'):
+            ids = get_id_list(params, field)
+            if ids:
+                queryset = queryset.filter(**{field + '__in': ids})
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+
+        start = get_datetime(params, 'start')
+        end = get_datetime(params, 'end')
+        if start or end:
+            occurrences = SomEnergiaOccurrence.objects.all()
+            if start:
+                occurrences = occurrences.filter(end_time__gt=start)
+            if end:
+                occurrences = occurrences.filter(start_time__lt=end)
+            queryset = queryset.filter(
+                pk__in=occurrences.values('absence')
+            )
+
+        return queryset
+
+    def get_serializer_context(self):
+        context = super(SomEnergiaAbsenceViewSet, self).get_serializer_context()
+        context['reject_conflicts'] = self.action != 'check'
+        return context
+
+    def check(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        worker = serializer.validated_data['worker']
+        times = serializer.occurrence_times
+
+        return Response({
+            'conflicts': find_conflicts(worker, times),
+            'teammates': find_teammates_off(worker, times),
+        })
+
+    def get_permissions(self):
+        # referents are checked per team by the action itself
+        if self.action == 'approve':
+            return [IsAuthenticated()]
+        return super(SomEnergiaAbsenceViewSet, self).get_permissions()
+
+    def approve(self, request, *args, **kwargs):
+        """Approve or reject a batch of absences in a single transaction.
+
+        Absences breaking the duration bounds of their type can not be
+        approved. Approvals leaving a team below its ``min_worker`` are
+        refused with the days they take below it, unless ``force`` is set.
+        """
+        serializer = AbsenceApprovalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        new_status = serializer.validated_data['status']
+
+        with transaction.atomic():
+            absences = list(
+                SomEnergiaAbsence.objects.select_for_update(
+                    of=('self',)
+                ).filter(
+                    pk__in=ids
+                ).select_related('absence_type').order_by('pk')
+            )
+            missing = ids - {absence.pk for absence in absences}
+            if missing:
+                raise ValidationError({'ids': [
+                    'Unknown absences: {}.'.format(
+                        ', '.join(str(pk) for pk in sorted(missing))
+                    )
+                ]})
+            denied = unauthorized_absences(request.user, absences)
+            if denied:
+                raise PermissionDenied(
+                    'You can not approve the absences {}.'.format(
+                        ', '.join(str(absence.pk) for absence in denied)
+                    )
+                )
+
+            if new_status == SomEnergiaAbsence.APPROVED:
+                errors = duration_errors(absences)
+                if errors:
+                    raise ValidationError({'ids': [
+                        'Absence {}: {}'.format(pk, error)
+                        for pk, absence_errors in sorted(errors.items())
+                        for error in absence_errors
+                    ]})
+
+            approving = [
+                absence for absence in absences
+                if absence.status != SomEnergiaAbsence.APPROVED
+            ]
+            set_status(absences, new_status)
+            if new_status == SomEnergiaAbsence.APPROVED and \
+               not serializer.validated_data['force']:
+                violations = coverage_violations(approving)
+                if violations:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'coverage': violations},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+        return Response({
+            'status': new_status,
+            'ids': [absence.pk for absence in absences],
+        })
+
+    def perform_destroy(self, instance):
+        delete_absence(instance)
+
+
+class SyncView(APIView):
+    """Objects created, modified or deleted since the ``since`` timestamp.
+
+    The returned ``until`` is the ``since`` of the next call. Without
+    ``since`` every object is returned, a page at a time: while ``next``
+    is set, it is passed as ``cursor`` to get the following page. Changes
+    older than the tombstone retention are answered with 410 Gone, and the
+    client has to sync from scratch.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        context = {'request': request}
+        since = get_datetime(params, 'since')
+        if since is None:
+            return self.snapshot(request, params.get('cursor'), context)
+
+        until = timezone.now()
+        if is_expired(since, until):
+            return Response(
+                {'detail': 'Changes this old are no longer kept, '
+                           'sync again without since.'},
+                status=status.HTTP_410_GONE
+            )
+        changes = get_changes(request.user, since, until, context=context)
+        return Response({
+            'since': since,
+            'until': until,
+            'upserts': changes['upserts'],
+            'tombstones': changes['tombstones'],
+            'next': None,
+        })
+
+    def snapshot(self, request, cursor, context):
+        until = timezone.now()
+        position = None
+        if cursor:
+            try:
+                until, name, pk = read_snapshot_cursor(cursor)
+            except signing.BadSignature:
+                raise ValidationError({'cursor': ['Invalid cursor.']})
+            position = (name, pk)
+        snapshot = get_snapshot(
+            request.user, until, position, context=context
+        )
+        return Response({
+            'since': None,
+            'until': until,
+            'upserts': snapshot['upserts'],
+            'tombstones': OrderedDict(
+                (name, []) for name in snapshot['upserts']
+            ),
+            'next': snapshot['next'],
+        })
+
+
+class AbsenceReportView(APIView):
+    """Approved absence days of a year grouped by team, worker, type and
+    month, as JSON or, with ``output=csv`` or ``Accept: text/csv``, as a
+    streamed CSV file. Only superusers may read it."""
+    queryset = SomEnergiaAbsence.objects.all()
+    permission_classes = (IsSuperUser,)
+
+    def get_renderers(self):
+        renderers = super(AbsenceReportView, self).get_renderers()
+        renderers.append(CSVRenderer())
+        return renderers
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            year = int(params.get('year') or timezone.now().year)
+            if not 1 <= year < 9999:
+                raise ValueError(year)
+        except ValueError:
+            raise ValidationError({'year': ['Expected a year.']})
+        group_by = [
+            group for group in
+            params.get('group_by', 'team,type,month').split(',') if group
+        ]
+        unknown = [group for group in group_by if group not in REPORT_GROUPS]
+        if unknown or not group_by or len(set(group_by)) != len(group_by):
+            raise ValidationError({'group_by': [
+                'Expected a list of distinct groups among: {}.'.format(
+                    ', '.join(REPORT_GROUPS)
+                )
+            ]})
+        output = params.get('output') or (
+            'csv' if request.accepted_renderer.format == 'csv' else 'json'
+        )
+        if output not in ('json', 'csv'):
+            raise ValidationError({'output': ['Expected json or csv.']})
+
+        rows = absence_report(year, group_by)
+        if output == 'csv':
+            response = StreamingHttpResponse(
+                render_csv(report_columns(group_by), rows),
+                content_type=CSV_CONTENT_TYPE
+            )
+            response['Content-Disposition'] = (
+                'attachment; filename="absences-{}.csv"'.format(year)
+            )
+            return response
+        return Response({
+            'year': year,
+            'group_by': group_by,
+            'results': list(rows),
+        })
+
+
+class MetricsView(APIView):
+    """Request and cache metrics of this process, for Prometheus."""
+    permission_classes = (IsSuperUser,)
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE
+        )